@@ -1,32 +1,496 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from api_metrics import RequestMetrics
+from response_cache import ResponseCache
 
 BASE_URL = "http://localhost:8000/api"
 
+# Pool de conexões compartilhado por todas as instâncias de ApiClient
+POOL_CONNECTIONS = 4 # Quantidade de hosts distintos mantidos no pool
+POOL_MAXSIZE = 16 # Conexões keep-alive reutilizáveis por host
+
+# Limite de requisições simultâneas disparadas por fetch_many
+FAN_OUT_MAX_WORKERS = 8
+
+# GET condicional: validadores (ETag/Last-Modified) e corpo JSON bruto por URL, decodificado a cada uso
+CONDITIONAL_GET = True
+MAX_VALIDATOR_ENTRIES = 256
+
+# GETs idênticos simultâneos compartilham uma única requisição
+SINGLE_FLIGHT = True
+
+# Timeouts (conexão, leitura) em segundos de cada tentativa
+REQUEST_TIMEOUT = (3.05, 10)
+# Prazo total padrão de uma tela (fetch_many / ApiClient.deadline)
+SCREEN_DEADLINE = 20
+# Novas tentativas para GETs (idempotentes) após falha de conexão, timeout ou 502/503/504
+GET_RETRIES = 2
+RETRY_BACKOFF = 0.25 # Espera antes da 1ª nova tentativa; dobra a cada tentativa
+RETRY_STATUSES = (502, 503, 504)
+# Disjuntor: após N chamadas seguidas sem conseguir conectar (já com as novas tentativas),
+# recusa requisições por RESET segundos. Timeouts de leitura não contam: o servidor está no ar
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 10
+
+CONNECTION_ERROR_MESSAGE = "Could not connect to the API. Is the server running?"
+TIMEOUT_ERROR_MESSAGE = "The API did not respond in time."
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+_validators = OrderedDict() # {chave_url: (corpo, etag, last_modified)}
+_validators_lock = threading.Lock()
+_disk_cache = None # ResponseCache opcional, ativado por enable_disk_cache()
+_in_flight = {} # {chave_url: _InFlight}
+_in_flight_lock = threading.Lock()
+_flight_stats = {"issued": 0, "coalesced": 0}
+_deadline_local = threading.local() # Prazo (time.monotonic) das requisições da thread atual
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """O prazo da tela/chamada acabou antes de a requisição terminar."""
+
+class _CircuitBreaker:
+    """Falha rápida enquanto a API está sabidamente fora do ar, liberando uma tentativa a cada intervalo."""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            # Meio-aberto: libera esta tentativa e só a próxima depois de outro intervalo
+            self._opened_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+_breaker = _CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+def _current_deadline():
+    return getattr(_deadline_local, "deadline", None)
+
+def remaining_time():
+    """Segundos até o prazo da thread atual, ou None se não houver prazo."""
+    deadline = _current_deadline()
+    return None if deadline is None else deadline - time.monotonic()
+
+@contextmanager
+def request_deadline(seconds):
+    """Limita o tempo total das requisições feitas pela thread atual dentro do bloco."""
+    previous = _current_deadline()
+    deadline = time.monotonic() + seconds
+    _deadline_local.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _deadline_local.deadline = previous
+
+def _run_with_deadline(deadline, func, *args):
+    # Propaga o prazo de quem chamou fetch_many para a thread do pool
+    _deadline_local.deadline = deadline
+    try:
+        return func(*args)
+    finally:
+        _deadline_local.deadline = None
+
+def _attempt_timeout():
+    remaining = remaining_time()
+    if remaining is None:
+        return REQUEST_TIMEOUT
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded before sending the request")
+    connect_timeout, read_timeout = REQUEST_TIMEOUT
+    return (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+def _send(send, retries=0):
+    """Chama send(timeout) e reenvia com backoff exponencial falhas transitórias, até `retries` vezes.
+
+    O disjuntor registra no máximo uma falha por chamada, e só se a última tentativa não conectou.
+    """
+    attempt = 0
+    while True:
+        connect_failed = False
+        try:
+            response = send(_attempt_timeout())
+        except DeadlineExceeded:
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # ConnectTimeout é ConnectionError; ReadTimeout não
+            connect_failed = isinstance(e, requests.exceptions.ConnectionError)
+            if attempt >= retries or not _breaker.allow_request():
+                if connect_failed:
+                    _breaker.record_failure()
+                raise
+        else:
+            _breaker.record_success()
+            if attempt >= retries or response.status_code not in RETRY_STATUSES:
+                return response
+        delay = RETRY_BACKOFF * (2 ** attempt)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            if connect_failed:
+                _breaker.record_failure()
+            raise DeadlineExceeded("Deadline exceeded while waiting to retry")
+        time.sleep(delay)
+        attempt += 1
+
+def _get_session():
+    """Retorna a sessão HTTP única do processo, criando-a na primeira chamada."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                _session = session
+    return _session
+
+def _get_executor():
+    """Retorna o pool de threads limitado usado para buscas em paralelo."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FAN_OUT_MAX_WORKERS, thread_name_prefix="api-fan-out")
+    return _executor
+
+def enable_disk_cache(path=None, **kwargs):
+    """Ativa o cache em disco das respostas GET (kwargs: ttl, max_bytes). Devolve o cache ou None."""
+    global _disk_cache
+    try:
+        _disk_cache = ResponseCache(path, **kwargs)
+    except Exception as e:
+        print(f"Disk cache unavailable: {e}")
+        _disk_cache = None
+    return _disk_cache
+
+def disable_disk_cache():
+    global _disk_cache
+    cache, _disk_cache = _disk_cache, None
+    if cache is not None:
+        cache.close()
+
+def _validator_key(url, params):
+    if not params:
+        return url
+    return url + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+def _get_validators(key):
+    with _validators_lock:
+        entry = _validators.get(key)
+        if entry is not None:
+            _validators.move_to_end(key)
+        return entry
+
+def _lookup_cached(key):
+    """Procura (corpo, etag, last_modified) na memória e, se ausente, no cache em disco."""
+    entry = _get_validators(key)
+    if entry is not None:
+        return entry, False
+    if _disk_cache is not None:
+        entry = _disk_cache.get(key)
+        if entry is not None:
+            return entry, True
+    return None, False
+
+def _validators_remember(key, entry):
+    with _validators_lock:
+        _validators[key] = entry
+        _validators.move_to_end(key)
+        while len(_validators) > MAX_VALIDATOR_ENTRIES:
+            _validators.popitem(last=False)
+
+def _store_validators(key, response, body):
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _validators_remember(key, (body, etag, last_modified))
+    else:
+        with _validators_lock:
+            _validators.pop(key, None)
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry is not None:
+        _, etag, last_modified = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+class _InFlight:
+    """GET em andamento; as threads que pedirem a mesma URL aguardam este resultado."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.body = None # JSON bruto da resposta, para cada thread decodificar a sua cópia
+
+def _single_flight(key, send):
+    """Executa send() uma única vez por chave enquanto houver uma requisição igual em andamento.
+
+    send() devolve (resultado, corpo JSON bruto ou None). Devolve (resultado, True se esta thread
+    fez a requisição); cada thread que aguardou decodifica o corpo e recebe sua própria cópia.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = _InFlight()
+            _flight_stats["issued"] += 1
+        else:
+            _flight_stats["coalesced"] += 1
+
+    if not leader:
+        remaining = remaining_time()
+        if not flight.done.wait(None if remaining is None else max(remaining, 0)):
+            return {"error": TIMEOUT_ERROR_MESSAGE}, False
+        if flight.body is not None:
+            return json.loads(flight.body), False
+        return dict(flight.result) if isinstance(flight.result, dict) else flight.result, False
+
+    try:
+        flight.result, flight.body = send()
+    except Exception as e:
+        flight.result = {"error": str(e)}
+    finally:
+        with _in_flight_lock:
+            if _in_flight.get(key) is flight:
+                del _in_flight[key]
+        flight.done.set()
+    return flight.result, True
+
+def _detach_in_flight():
+    with _in_flight_lock:
+        _in_flight.clear()
+
+def single_flight_stats():
+    """Contadores de GETs enviados à rede ("issued") e agrupados a outro em andamento ("coalesced")."""
+    with _in_flight_lock:
+        return dict(_flight_stats, in_flight=len(_in_flight))
+
+def reset_single_flight_stats():
+    with _in_flight_lock:
+        _flight_stats["issued"] = 0
+        _flight_stats["coalesced"] = 0
+
+def _new_record(method, endpoint):
+    return {
+        "timestamp": time.time(),
+        "method": method,
+        "endpoint": endpoint,
+        "status": None,
+        "ttfb_ms": None, # Até os cabeçalhos da última tentativa (response.elapsed)
+        "latency_ms": None, # Tempo total da chamada, incluindo novas tentativas e espera
+        "bytes": 0,
+        "decode_ms": None,
+        "cache": None, # "hit" (304), "miss", "coalesced" ou None (escritas)
+        "error": None,
+    }
+
+def _measure_response(record, response):
+    record["status"] = response.status_code
+    record["ttfb_ms"] = response.elapsed.total_seconds() * 1000
+    record["bytes"] = len(response.content)
+
 class ApiClient:
+    def __init__(self):
+        self._mutation_listeners = []
+        self._request_hooks = []
+        # Últimas requisições com latência, tamanho e uso de cache
+        self.metrics = RequestMetrics()
+        self.add_request_hook(self.metrics.record)
+
+    def add_request_hook(self, callback):
+        """Registra callback(record), chamado ao fim de cada requisição com um dict de medições."""
+        self._request_hooks.append(callback)
+
+    def remove_request_hook(self, callback):
+        if callback in self._request_hooks:
+            self._request_hooks.remove(callback)
+
+    def _notify_request(self, record):
+        for callback in self._request_hooks:
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"Request hook failed for {record['method']} {record['endpoint']}: {e}")
+
+    def add_mutation_listener(self, callback):
+        """Registra callback(method, endpoint, data, response), chamado após cada POST/PUT/DELETE bem-sucedido."""
+        self._mutation_listeners.append(callback)
+
+    def _notify_mutation(self, method, endpoint, data, result):
+        for callback in self._mutation_listeners:
+            try:
+                callback(method, endpoint, data, result)
+            except Exception as e:
+                print(f"Mutation listener failed for {method} {endpoint}: {e}")
+
     def _make_request(self, method, endpoint, data=None):
+        record = _new_record(method, endpoint)
+        start = time.perf_counter()
+        if method == "GET" and SINGLE_FLIGHT:
+            key = _validator_key(f"{BASE_URL}/{endpoint}", data)
+            result, leader = _single_flight(key, lambda: self._request(method, endpoint, data, record))
+            if not leader:
+                record["cache"] = "coalesced"
+                if isinstance(result, dict) and "error" in result:
+                    record["error"] = result["error"]
+        else:
+            result = self._send_request(method, endpoint, data, record)
+            if method != "GET":
+                # GETs iniciados antes da escrita podem trazer dados antigos: novos pedidos não devem aguardá-los
+                _detach_in_flight()
+        record["latency_ms"] = (time.perf_counter() - start) * 1000
+        self._notify_request(record)
+        return result
+
+    def _send_request(self, method, endpoint, data=None, record=None):
+        return self._request(method, endpoint, data, record)[0]
+
+    def _request(self, method, endpoint, data=None, record=None):
+        """Executa a requisição e devolve (resultado, corpo JSON bruto ou None)."""
+        if record is None:
+            record = _new_record(method, endpoint)
         url = f"{BASE_URL}/{endpoint}"
+        body = None
+        if not _breaker.allow_request():
+            # API sabidamente fora do ar: falha na hora em vez de prender mais threads em timeouts
+            record["error"] = "circuit open"
+            return {"error": CONNECTION_ERROR_MESSAGE}, None
+        session = _get_session()
         try:
             if method == "GET":
-                response = requests.get(url, params=data)
+                cache_key = _validator_key(url, data)
+                cached, from_disk = _lookup_cached(cache_key)
+                headers = _conditional_headers(cached) if CONDITIONAL_GET else {}
+                response = _send(lambda timeout: session.get(url, params=data, headers=headers, timeout=timeout),
+                                 retries=GET_RETRIES)
+                _measure_response(record, response)
+                record["cache"] = "hit" if response.status_code == 304 and cached is not None else "miss"
+                if response.status_code == 304 and cached is not None: # Not Modified: reuse cached body
+                    if from_disk:
+                        _validators_remember(cache_key, cached)
+                        _disk_cache.touch(cache_key)
+                    # O cache guarda só o JSON bruto: cada chamada recebe objetos próprios
+                    decode_start = time.perf_counter()
+                    result = json.loads(cached[0])
+                    record["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+                    return result, cached[0]
             elif method == "POST":
-                response = requests.post(url, data=data)
+                response = _send(lambda timeout: session.post(url, data=data, timeout=timeout))
             elif method == "PUT":
-                response = requests.put(url, data=data)
+                response = _send(lambda timeout: session.put(url, data=data, timeout=timeout))
             elif method == "DELETE":
-                response = requests.delete(url)
+                response = _send(lambda timeout: session.delete(url, timeout=timeout))
+            if method != "GET":
+                _measure_response(record, response)
             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
             if response.status_code == 204: # No Content for successful delete
-                return True
-            return response.json()
+                result = True
+            else:
+                decode_start = time.perf_counter()
+                result = response.json()
+                record["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+                if method == "GET":
+                    body = response.content
+                    _store_validators(cache_key, response, body)
+                    if _disk_cache is not None:
+                        _disk_cache.set(cache_key, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
         except requests.exceptions.HTTPError as e:
             print(f"HTTP Error: {e.response.status_code} - {e.response.text}")
-            return {"error": e.response.text}
+            record["error"] = f"HTTP {e.response.status_code}"
+            return {"error": e.response.text}, None
+        except requests.exceptions.Timeout as e:
+            print(f"Timeout Error: {e}")
+            record["error"] = "timeout"
+            return {"error": TIMEOUT_ERROR_MESSAGE}, None
         except requests.exceptions.ConnectionError as e:
             print(f"Connection Error: {e}")
-            return {"error": "Could not connect to the API. Is the server running?"}
+            record["error"] = "connection"
+            return {"error": CONNECTION_ERROR_MESSAGE}, None
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
-            return {"error": str(e)}
+            record["error"] = str(e)
+            return {"error": str(e)}, None
+
+        if method != "GET":
+            self._notify_mutation(method, endpoint, data, result)
+        return result, body
+
+    def get_cached(self, endpoint):
+        """Última resposta conhecida de um GET (memória ou disco), sem acessar a rede."""
+        entry, _ = _lookup_cached(_validator_key(f"{BASE_URL}/{endpoint}", None))
+        if entry is None:
+            return None
+        try:
+            return json.loads(entry[0])
+        except ValueError:
+            return None
+
+    def deadline(self, seconds=SCREEN_DEADLINE):
+        """Contexto que limita o tempo total das requisições feitas pela thread atual."""
+        return request_deadline(seconds)
+
+    def fetch_many(self, deadline=SCREEN_DEADLINE, **calls):
+        """Executa várias chamadas da API em paralelo e devolve {chave: resposta}.
+
+        Cada valor é um método do cliente (ex.: races=client.get_races) ou uma
+        tupla (método, *args). Falhas de uma chamada viram {"error": ...} só
+        naquela chave, sem afetar as demais. Chamadas que não terminarem em
+        `deadline` segundos também viram erro.
+        """
+        deadline_at = time.monotonic() + deadline
+        if _current_deadline() is not None:
+            deadline_at = min(deadline_at, _current_deadline())
+        executor = _get_executor()
+        futures = {}
+        for key, call in calls.items():
+            func, args = (call[0], call[1:]) if isinstance(call, tuple) else (call, ())
+            futures[key] = executor.submit(_run_with_deadline, deadline_at, func, *args)
+
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(timeout=max(deadline_at - time.monotonic(), 0))
+            except FutureTimeoutError:
+                print(f"Deadline exceeded in '{key}'")
+                results[key] = {"error": TIMEOUT_ERROR_MESSAGE}
+            except Exception as e:
+                print(f"An unexpected error occurred in '{key}': {e}")
+                results[key] = {"error": str(e)}
+        return results
 
     # Drivers
     def get_drivers(self):
@@ -0,0 +1,104 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+
+# Capacidade padrão do buffer circular de requisições
+DEFAULT_CAPACITY = 2000
+# Limites superiores (ms) das faixas do histograma de latência
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+def normalize_endpoint(endpoint):
+    """Agrupa endpoints com ids numéricos, ex.: "drivers/12" -> "drivers/{id}"."""
+    path = endpoint.split("?", 1)[0].strip("/")
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+def percentile(sorted_values, pct):
+    """Percentil pelo método nearest-rank; sorted_values deve estar ordenada."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def _bucket_label(latency_ms):
+    for limit in LATENCY_BUCKETS_MS:
+        if latency_ms <= limit:
+            return f"<={limit}ms"
+    return f">{LATENCY_BUCKETS_MS[-1]}ms"
+
+class RequestMetrics:
+    """Buffer circular com o registro de cada requisição do ApiClient e estatísticas por endpoint."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def record(self, record):
+        """Hook do ApiClient: guarda uma cópia do registro da requisição, numerada por "seq"."""
+        with self._lock:
+            self._seq += 1
+            record = dict(record)
+            record["seq"] = self._seq
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def endpoint_stats(self):
+        """Devolve {endpoint_normalizado: estatísticas} das requisições ainda no buffer."""
+        grouped = {}
+        for record in self.records():
+            key = f"{record.get('method')} {normalize_endpoint(record.get('endpoint', ''))}"
+            grouped.setdefault(key, []).append(record)
+
+        stats = {}
+        for key, records in grouped.items():
+            latencies = sorted(r["latency_ms"] for r in records if r.get("latency_ms") is not None)
+            ttfbs = sorted(r["ttfb_ms"] for r in records if r.get("ttfb_ms") is not None)
+            histogram = {}
+            for latency in latencies:
+                label = _bucket_label(latency)
+                histogram[label] = histogram.get(label, 0) + 1
+            cache = {}
+            for r in records:
+                if r.get("cache"):
+                    cache[r["cache"]] = cache.get(r["cache"], 0) + 1
+            stats[key] = {
+                "count": len(records),
+                "errors": sum(1 for r in records if r.get("error")),
+                "bytes": sum(r.get("bytes") or 0 for r in records),
+                "latency_ms": {
+                    "mean": sum(latencies) / len(latencies) if latencies else None,
+                    "p50": percentile(latencies, 50),
+                    "p90": percentile(latencies, 90),
+                    "p95": percentile(latencies, 95),
+                    "p99": percentile(latencies, 99),
+                    "max": latencies[-1] if latencies else None,
+                },
+                "ttfb_ms": {"p50": percentile(ttfbs, 50), "p90": percentile(ttfbs, 90)},
+                "histogram": histogram,
+                "cache": cache,
+            }
+        return stats
+
+    def export_json(self, path):
+        """Grava os registros e as estatísticas por endpoint em um arquivo JSON."""
+        payload = {
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+            "endpoints": self.endpoint_stats(),
+            "records": self.records(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        return path
@@ -0,0 +1,461 @@
+import tkinter as tk
+from tkinter import ttk
+
+from image_loader import load_image_async
+from ui_elements import load_icon, COLOR_BACKGROUND_DARK, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_LIGHT, \
+    COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_DANGER_ACCENT, COLOR_BUTTON_TEXT
+
+# Distância (px) além da área visível a partir da qual as imagens dos cards já são pedidas
+IMAGE_PRELOAD_MARGIN = 240
+# Acima deste número de itens a AdaptiveCardGrid passa a usar a grade virtualizada
+VIRTUAL_GRID_THRESHOLD = 60
+# Linhas materializadas acima e abaixo da área visível na grade virtualizada
+VIRTUAL_BUFFER_ROWS = 2
+# Acima deste número de itens a AdaptiveCardGrid desenha os cards no canvas (CanvasCardGrid)
+CANVAS_GRID_THRESHOLD = 500
+
+def _bind_mousewheel(root):
+    # Um único dispatcher global por aplicação, em vez de um bind_all por grade criada
+    if getattr(root, "_card_grid_wheel_bound", False):
+        return
+    root._card_grid_wheel_bound = True
+    dispatch = lambda event: _dispatch_mousewheel(root, event)
+    root.bind_all("<MouseWheel>", dispatch, add="+") # Windows e macOS
+    root.bind_all("<Button-4>", dispatch, add="+")   # Linux (scroll up)
+    root.bind_all("<Button-5>", dispatch, add="+")   # Linux (scroll down)
+
+def _dispatch_mousewheel(root, event):
+    """Rola só a grade sob o ponteiro (a mais interna, se houver grades aninhadas)."""
+    try:
+        widget = root.winfo_containing(event.x_root, event.y_root)
+    except (KeyError, tk.TclError):
+        # Ex.: popdown de Combobox, que não tem objeto Python correspondente
+        return
+    while widget is not None and not isinstance(widget, _ScrollableGrid):
+        widget = widget.master
+    if widget is not None:
+        widget._on_mousewheel(event)
+
+class _ScrollableGrid(tk.Frame):
+    """Canvas rolável com scrollbar automática e roda do mouse, base das grades de cards."""
+
+    def __init__(self, parent, card_factory, columns=4, card_size=(340, 240), padding=(15, 15),
+                 bg=COLOR_BACKGROUND_DARK, **kwargs):
+        super().__init__(parent, bg=bg, **kwargs)
+        self.card_factory = card_factory
+        self.columns = columns
+        self.card_width, self.card_height = card_size
+        self.padding_x, self.padding_y = padding
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        _bind_mousewheel(self._root())
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0: # Scroll para cima
+            self.canvas.yview_scroll(-1, "unit")
+        elif event.num == 5 or event.delta < 0: # Scroll para baixo
+            self.canvas.yview_scroll(1, "unit")
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Mostra a scrollbar apenas quando o conteúdo é maior que o canvas
+        if float(first) <= 0 and float(last) >= 1:
+            self.scrollbar.pack_forget()
+        elif not self.scrollbar.winfo_manager():
+            self.scrollbar.pack(side="right", fill="y")
+        self._on_view_changed()
+
+    def _on_view_changed(self):
+        pass
+
+    def _prepare_card(self, card):
+        card.grid_propagate(False)
+        card.config(width=self.card_width, height=self.card_height)
+        return card
+
+class CardGrid(_ScrollableGrid):
+    """Grade rolável de cards, em linhas de até `columns` cards.
+
+    As imagens só são pedidas quando o card chega perto da área visível do canvas.
+    card_factory(parent, item) deve criar um BaseEntityCard com lazy_image=True.
+    Cards e linhas criados em recargas anteriores são reaproveitados via bind_item.
+    """
+
+    def __init__(self, parent, card_factory, **kwargs):
+        super().__init__(parent, card_factory, **kwargs)
+        self.items = []
+        self.cards = [] # Cards em uso, na ordem dos itens
+        self._card_pool = [] # Todos os cards já criados; o card i fica sempre na linha i // columns
+        self._row_frames = []
+        self._pending_images = [] # Cards cuja imagem ainda não foi pedida
+        self._image_job = None
+
+        self.cards_container = tk.Frame(self.canvas, bg=self.cget("bg"))
+        self.canvas.create_window((0, 0), window=self.cards_container, anchor="nw")
+        self.cards_container.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.canvas.bind("<Configure>", lambda e: self.schedule_images())
+        self.bind("<Map>", lambda e: self.schedule_images())
+
+    def _on_view_changed(self):
+        self.schedule_images()
+
+    def set_items(self, items):
+        """Exibe os itens reaproveitando os cards e as linhas já criados; volta ao topo se algo mudou."""
+        items = list(items)
+        if items == self.items:
+            self.schedule_images() # Nada mudou: só retoma imagens pendentes
+            return
+        self.cancel_images()
+        self.items = items
+
+        row_count = (len(items) + self.columns - 1) // self.columns
+        while len(self._row_frames) < row_count:
+            self._row_frames.append(tk.Frame(self.cards_container, bg=self.cget("bg")))
+        for index, item in enumerate(items):
+            if index < len(self._card_pool):
+                self._card_pool[index].bind_item(item)
+            else:
+                row_frame = self._row_frames[index // self.columns]
+                self._card_pool.append(self._prepare_card(self.card_factory(row_frame, item)))
+
+        # Sobras do pool ficam escondidas; reexibidas em ordem, mantêm a posição no pack
+        for index, row_frame in enumerate(self._row_frames):
+            self._set_packed(row_frame, index < row_count, pady=self.padding_y, anchor="center")
+        for index, card in enumerate(self._card_pool):
+            self._set_packed(card, index < len(items), side=tk.LEFT, padx=self.padding_x, pady=0)
+        self.cards = self._card_pool[:len(items)]
+        self._pending_images = list(self.cards)
+
+        self.canvas.update_idletasks() # Força a atualização do layout para obter dimensões corretas
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.canvas.yview_moveto(0) # Volta para o topo ao recarregar a lista
+        self.schedule_images()
+
+    @staticmethod
+    def _set_packed(widget, visible, **pack_options):
+        if visible and not widget.winfo_manager():
+            widget.pack(**pack_options)
+        elif not visible and widget.winfo_manager():
+            widget.pack_forget()
+
+    def clear(self):
+        self.set_items([])
+
+    # Imagens sob demanda
+    def schedule_images(self):
+        """Agenda (agrupando eventos de rolagem) o pedido das imagens dos cards próximos da área visível."""
+        if self._image_job is None and self._pending_images:
+            self._image_job = self.after(30, self._load_visible_images)
+
+    def _load_visible_images(self):
+        self._image_job = None
+        if not self.winfo_ismapped():
+            return # <Map> agenda de novo quando a grade voltar a aparecer
+        top = self.canvas.canvasy(0) - IMAGE_PRELOAD_MARGIN
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + IMAGE_PRELOAD_MARGIN
+
+        still_pending = []
+        for card in self._pending_images:
+            # O canvas rola cards_container, cujas coordenadas são as de cada linha + card
+            y = card.master.winfo_y() + card.winfo_y()
+            if y + card.winfo_height() >= top and y <= bottom:
+                card.load_image()
+            else:
+                still_pending.append(card)
+        self._pending_images = still_pending
+
+    def cancel_images(self):
+        """Cancela os downloads em andamento; esses cards voltam a pedir a imagem quando visíveis."""
+        if self._image_job is not None:
+            self.after_cancel(self._image_job)
+            self._image_job = None
+        pending = set(map(id, self._pending_images))
+        for card in self.cards:
+            if id(card) not in pending and card.cancel_image():
+                self._pending_images.append(card)
+
+class VirtualCardGrid(_ScrollableGrid):
+    """Grade que só materializa os cards das linhas visíveis (mais VIRTUAL_BUFFER_ROWS).
+
+    Os cards são janelas do canvas posicionadas pelo índice do item; ao rolar, os que
+    saem da área são reaproveitados via BaseEntityCard.bind_item, então a quantidade
+    de widgets não depende do tamanho da coleção.
+    """
+
+    def __init__(self, parent, card_factory, buffer_rows=VIRTUAL_BUFFER_ROWS, **kwargs):
+        super().__init__(parent, card_factory, **kwargs)
+        self.buffer_rows = buffer_rows
+        self.items = []
+        self._visible = {} # {índice do item: (card, id da janela no canvas)}
+        self._free = [] # (card, id da janela) escondidos, prontos para reaproveitar
+        self._x_offset = 0
+
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.bind("<Map>", lambda e: self._render())
+
+    @property
+    def row_height(self):
+        return self.card_height + 2 * self.padding_y
+
+    @property
+    def column_width(self):
+        return self.card_width + 2 * self.padding_x
+
+    def _row_count(self):
+        return (len(self.items) + self.columns - 1) // self.columns
+
+    def _item_position(self, index):
+        row, col = divmod(index, self.columns)
+        return self._x_offset + col * self.column_width + self.padding_x, row * self.row_height + self.padding_y
+
+    def _on_canvas_configure(self, event):
+        # Centraliza as colunas na largura disponível, como as linhas da CardGrid
+        x_offset = max(0, (event.width - self.columns * self.column_width) // 2)
+        if x_offset != self._x_offset:
+            self._x_offset = x_offset
+            for index, slot in self._visible.items():
+                self._move_slot(slot, *self._item_position(index))
+        self._render()
+
+    def _on_view_changed(self):
+        self._render()
+
+    def set_items(self, items):
+        """Troca os itens exibidos e volta ao topo; os cards existentes são reaproveitados."""
+        self.items = list(items)
+        for index in list(self._visible):
+            self._release(index)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.column_width, self._row_count() * self.row_height))
+        self.canvas.yview_moveto(0)
+        self._render()
+
+    def clear(self):
+        self.set_items([])
+
+    def _visible_range(self):
+        height = self.canvas.winfo_height()
+        if height <= 1 or not self.items:
+            # Canvas ainda sem tamanho: materializa só as primeiras linhas
+            return range(0, min(len(self.items), (1 + self.buffer_rows) * self.columns))
+        top = self.canvas.canvasy(0)
+        first_row = max(0, int(top // self.row_height) - self.buffer_rows)
+        last_row = min(self._row_count() - 1, int((top + height) // self.row_height) + self.buffer_rows)
+        return range(first_row * self.columns, min((last_row + 1) * self.columns, len(self.items)))
+
+    def _render(self):
+        wanted = self._visible_range()
+        for index in [i for i in self._visible if i not in wanted]:
+            self._release(index)
+        for index in wanted:
+            if index not in self._visible:
+                self._acquire(index)
+
+    def _acquire(self, index):
+        item = self.items[index]
+        x, y = self._item_position(index)
+        if self._free:
+            card, window_id = self._free.pop()
+            card.bind_item(item)
+            self.canvas.coords(window_id, x, y)
+            self.canvas.itemconfigure(window_id, state="normal")
+        else:
+            card = self._prepare_card(self.card_factory(self.canvas, item))
+            window_id = self.canvas.create_window(x, y, window=card, anchor="nw",
+                                                  width=self.card_width, height=self.card_height)
+        card.load_image()
+        self._visible[index] = (card, window_id)
+
+    def _release(self, index):
+        card, window_id = self._visible.pop(index)
+        card.cancel_image()
+        self.canvas.itemconfigure(window_id, state="hidden")
+        self._free.append((card, window_id))
+
+    def _move_slot(self, slot, x, y):
+        self.canvas.coords(slot[1], x, y)
+
+    def schedule_images(self):
+        self._render()
+        for card, _ in self._visible.values():
+            card.load_image() # Retoma downloads cancelados; imagens já exibidas são ignoradas
+
+    def cancel_images(self):
+        for card, _ in self._visible.values():
+            card.cancel_image()
+
+class _CanvasCard:
+    """Itens de um card desenhado pela CanvasCardGrid, todos com a tag do card."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.item = None
+        self.x = self.y = 0
+        self.image_id = None
+        self.title_id = None
+        self.detail_ids = []
+        self.url = None # Imagem exibida ou em carregamento
+        self.photo = None # Referência ao PhotoImage exibido
+        self.request = None # image_loader.ImageRequest em andamento
+
+class CanvasCardGrid(VirtualCardGrid):
+    """Grade virtualizada que desenha os cards como itens do canvas, sem widgets.
+
+    Cada card é um retângulo, uma imagem, textos e dois botões (retângulo + texto)
+    com a tag do card; os cliques são roteados pelas tags "edit"/"delete" para a
+    EntityCardSpec. Os grupos de itens que saem da área visível são reaproveitados.
+    """
+
+    def __init__(self, parent, card_spec, image_size=(100, 100), **kwargs):
+        super().__init__(parent, card_factory=None, **kwargs)
+        self.spec = card_spec
+        self.image_size = image_size
+        self._slots = {} # {tag do card: _CanvasCard}
+        self.placeholder = load_icon("default_image", size=image_size)
+
+        self.canvas.tag_bind("edit", "<Button-1>", lambda e: self._on_action(self.spec.edit))
+        self.canvas.tag_bind("delete", "<Button-1>", lambda e: self._on_action(self.spec.delete))
+        self.canvas.tag_bind("action", "<Enter>", lambda e: self.canvas.config(cursor="hand2"))
+        self.canvas.tag_bind("action", "<Leave>", lambda e: self.canvas.config(cursor=""))
+
+    def _on_action(self, action):
+        slot = next((self._slots[tag] for tag in self.canvas.gettags("current") if tag in self._slots), None)
+        if slot is not None and slot.item is not None:
+            action(slot.item)
+
+    def _create_slot(self):
+        tag = f"card{len(self._slots)}"
+        slot = _CanvasCard(tag)
+        canvas, width, height = self.canvas, self.card_width, self.card_height
+        button_top = height - 45
+
+        canvas.create_rectangle(0, 0, width, height, fill=COLOR_BACKGROUND_MEDIUM, outline="", tags=(tag,))
+        text_x = 15
+        if self.spec.image_url_key:
+            image_width, image_height = self.image_size
+            slot.image_id = canvas.create_image(15 + image_width // 2, button_top // 2, tags=(tag,))
+            if self.placeholder:
+                canvas.itemconfigure(slot.image_id, image=self.placeholder)
+            text_x = image_width + 35
+        text_width = width - text_x - 10
+        slot.title_id = canvas.create_text(text_x, 20, anchor="nw", width=text_width, font=("Arial", 12, "bold"),
+                                           fill=COLOR_PRIMARY_ACCENT, tags=(tag,))
+        for line in range(len(self.spec.detail_lines_info)):
+            slot.detail_ids.append(canvas.create_text(text_x, 55 + 20 * line, anchor="nw", width=text_width,
+                                                      font=("Arial", 10), fill=COLOR_FOREGROUND_LIGHT, tags=(tag,)))
+
+        for action, text, color, x0, x1 in (("edit", "Editar", COLOR_SUCCESS_ACCENT, 10, width // 2 - 5),
+                                            ("delete", "Excluir", COLOR_DANGER_ACCENT, width // 2 + 5, width - 10)):
+            tags = (tag, "action", action)
+            canvas.create_rectangle(x0, button_top, x1, height - 10, fill=color, outline="", tags=tags)
+            canvas.create_text((x0 + x1) // 2, (button_top + height - 10) // 2, text=text, font=("Arial", 10, "bold"),
+                               fill=COLOR_BUTTON_TEXT, tags=tags)
+
+        self._slots[tag] = slot
+        return slot
+
+    def _acquire(self, index):
+        slot = self._free.pop() if self._free else self._create_slot()
+        self._move_slot(slot, *self._item_position(index))
+        self.canvas.itemconfigure(slot.tag, state="normal")
+        self._bind_slot(slot, self.items[index])
+        self._load_slot_image(slot)
+        self._visible[index] = slot
+
+    def _release(self, index):
+        slot = self._visible.pop(index)
+        self._cancel_slot_image(slot)
+        self.canvas.itemconfigure(slot.tag, state="hidden")
+        self._free.append(slot)
+
+    def _move_slot(self, slot, x, y):
+        self.canvas.move(slot.tag, x - slot.x, y - slot.y)
+        slot.x, slot.y = x, y
+
+    def _bind_slot(self, slot, item):
+        if item == slot.item:
+            return
+        slot.item = item
+        self.canvas.itemconfigure(slot.title_id, text=self.spec.title(item))
+        for text_id, text in zip(slot.detail_ids, self.spec.detail_texts(item)):
+            self.canvas.itemconfigure(text_id, text=text)
+        if slot.image_id is not None and slot.url != self.spec.image_url(item):
+            self._cancel_slot_image(slot)
+            slot.url, slot.photo = None, None
+            self.canvas.itemconfigure(slot.image_id, image=self.placeholder or "")
+
+    # Imagens
+    def _load_slot_image(self, slot):
+        if slot.image_id is None:
+            return
+        url = self.spec.image_url(slot.item)
+        if not url or url == slot.url:
+            return # Sem imagem, ou já exibida/em carregamento
+        slot.url = url
+        request = load_image_async(self.canvas, url, self.image_size,
+                                   lambda photo, error: self._on_image_loaded(slot, url, photo, error))
+        slot.request = None if request.done else request
+
+    def _on_image_loaded(self, slot, url, photo, error):
+        slot.request = None
+        if slot.url != url:
+            return # O card foi reaproveitado para outro item
+        if photo is not None:
+            slot.photo = photo
+            self.canvas.itemconfigure(slot.image_id, image=photo)
+        else:
+            print(f"ERRO: Falha ao carregar imagem: {error}. URL: {url}")
+
+    def _cancel_slot_image(self, slot):
+        if slot.request is not None:
+            slot.request.cancel()
+            slot.request = None
+            slot.url = None # Será pedida de novo quando o card voltar a ser exibido
+
+    def schedule_images(self):
+        self._render()
+        for slot in self._visible.values():
+            self._load_slot_image(slot)
+
+    def cancel_images(self):
+        for slot in self._visible.values():
+            self._cancel_slot_image(slot)
+
+class AdaptiveCardGrid(tk.Frame):
+    """Escolhe a grade pelo tamanho da coleção: CardGrid em coleções pequenas, VirtualCardGrid acima
+    de `virtual_threshold` itens e, se card_spec for informada, CanvasCardGrid acima de `canvas_threshold`.
+    """
+
+    def __init__(self, parent, card_factory, card_spec=None, virtual_threshold=VIRTUAL_GRID_THRESHOLD,
+                 canvas_threshold=CANVAS_GRID_THRESHOLD, bg=COLOR_BACKGROUND_DARK, **kwargs):
+        super().__init__(parent, bg=bg)
+        self.virtual_threshold = virtual_threshold
+        self.canvas_threshold = canvas_threshold
+        self.simple_grid = CardGrid(self, card_factory, bg=bg, **kwargs)
+        self.virtual_grid = VirtualCardGrid(self, card_factory, bg=bg, **kwargs)
+        self.canvas_grid = CanvasCardGrid(self, card_spec, bg=bg, **kwargs) if card_spec is not None else None
+        self.active_grid = self.simple_grid
+        self.active_grid.pack(fill="both", expand=True)
+
+    def set_items(self, items):
+        if self.canvas_grid is not None and len(items) > self.canvas_threshold:
+            grid = self.canvas_grid
+        elif len(items) > self.virtual_threshold:
+            grid = self.virtual_grid
+        else:
+            grid = self.simple_grid
+        if grid is not self.active_grid:
+            self.active_grid.clear()
+            self.active_grid.pack_forget()
+            self.active_grid = grid
+            grid.pack(fill="both", expand=True)
+        grid.set_items(items)
+
+    def schedule_images(self):
+        self.active_grid.schedule_images()
+
+    def cancel_images(self):
+        self.active_grid.cancel_images()
@@ -0,0 +1,218 @@
+import threading
+import time
+
+from api_client import remaining_time, TIMEOUT_ERROR_MESSAGE
+
+# Tempo (em segundos) que uma coleção carregada é considerada atual
+DEFAULT_TTL = 60
+
+class EntityRepository:
+    """Cópia local de uma coleção da API, indexada por id e compartilhada entre as views."""
+
+    def __init__(self, fetch_func, ttl=DEFAULT_TTL, cached_func=None):
+        self._fetch_func = fetch_func
+        self._cached_func = cached_func # Última resposta conhecida (ex.: cache em disco), sem rede
+        self.ttl = ttl
+        self._items = {} # {id: item}, na ordem devolvida pela API
+        self._loaded_at = None
+        self._seeded = False
+        # Incrementada a cada alteração local; buscas iniciadas antes dela são descartadas
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock() # Evita duas buscas simultâneas da mesma coleção
+
+    def is_stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or (time.monotonic() - loaded_at) > self.ttl
+
+    def invalidate(self):
+        """Marca a coleção como desatualizada sem descartar os itens em memória."""
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def get_all(self, force=False):
+        """Devolve todos os itens, buscando na API apenas se a cópia local estiver vencida.
+
+        Em caso de erro devolve o dict {"error": ...} da API e mantém a cópia local. Se a coleção
+        for alterada localmente durante a busca, a resposta (anterior à escrita) é descartada.
+        A espera por outra busca da mesma coleção respeita o prazo da thread (request_deadline).
+        """
+        if force or self.is_stale():
+            remaining = remaining_time()
+            if not self._fetch_lock.acquire(timeout=-1 if remaining is None else max(remaining, 0)):
+                return {"error": TIMEOUT_ERROR_MESSAGE}
+            try:
+                # Outra thread pode ter atualizado enquanto esperávamos o lock
+                if not force and not self.is_stale():
+                    return self.items()
+                generation = self._generation
+                response = self._fetch_func()
+                if not isinstance(response, list):
+                    return response
+                self._replace(response, generation)
+            finally:
+                self._fetch_lock.release()
+        return self.items()
+
+    def peek(self):
+        """Itens já conhecidos, sem acessar a rede. Na primeira chamada usa a última resposta guardada em disco."""
+        with self._lock:
+            if not self._items and not self._seeded and self._cached_func is not None:
+                self._seeded = True
+                cached = self._cached_func()
+                if isinstance(cached, list):
+                    # Continua vencido: serve só para exibição até a próxima busca
+                    self._items = {item.get("id"): item for item in cached}
+            return list(self._items.values())
+
+    def items(self):
+        with self._lock:
+            return list(self._items.values())
+
+    def get(self, item_id):
+        with self._lock:
+            return self._items.get(_normalize_id(item_id))
+
+    def upsert(self, item):
+        """Insere ou substitui um item, mantendo a posição dos já existentes.
+
+        Se a coleção ainda não foi carregada da API, só a marca como alterada: um item isolado
+        não pode passar pela coleção inteira em peek().
+        """
+        with self._lock:
+            self._generation += 1
+            if self._loaded_at is None:
+                return
+            self._items[item.get("id")] = item
+
+    def remove(self, item_id):
+        with self._lock:
+            self._generation += 1
+            return self._items.pop(_normalize_id(item_id), None)
+
+    def _replace(self, items, generation):
+        with self._lock:
+            if generation != self._generation:
+                return # Houve escrita durante a busca: a coleção continua vencida
+            self._items = {item.get("id"): item for item in items}
+            self._loaded_at = time.monotonic()
+
+def _normalize_id(item_id):
+    # Ids vindos de Treeview/kwargs podem chegar como string
+    if isinstance(item_id, str) and item_id.isdigit():
+        return int(item_id)
+    return item_id
+
+# Coleções que a API remove em cascata quando um item do tipo da chave é excluído
+_DELETE_CASCADES = {
+    "drivers": ("contracts", "results"),
+    "teams": ("contracts", "results"),
+    "seasons": ("races", "contracts", "results"),
+    "circuits": ("races", "results"),
+    "races": ("results",),
+}
+
+class EntityStore:
+    """Agrupa um repositório por tipo de entidade da API e o mantém em dia com as escritas."""
+
+    def __init__(self, api_client, ttl=DEFAULT_TTL):
+        self.api_client = api_client
+        self.ttl = ttl
+        self.drivers = self._make_repository("drivers", api_client.get_drivers)
+        self.teams = self._make_repository("teams", api_client.get_teams)
+        self.seasons = self._make_repository("seasons", api_client.get_seasons)
+        self.circuits = self._make_repository("circuits", api_client.get_circuits)
+        self.races = self._make_repository("races", api_client.get_races)
+        self.contracts = self._make_repository("contracts", api_client.get_contracts)
+        self.results = self._make_repository("results", api_client.get_results)
+
+        self._standings = {} # {(tipo, season_id): (carregado_em, classificação)}
+        self._standings_lock = threading.Lock()
+
+        api_client.add_mutation_listener(self._on_mutation)
+
+    def _make_repository(self, endpoint, fetch_func):
+        return EntityRepository(fetch_func, self.ttl, cached_func=lambda: self.api_client.get_cached(endpoint))
+
+    def repository(self, name):
+        """Retorna o repositório pelo nome do endpoint (ex.: "drivers")."""
+        return getattr(self, name) if name in self.repository_names() else None
+
+    @staticmethod
+    def repository_names():
+        return ("drivers", "teams", "seasons", "circuits", "races", "contracts", "results")
+
+    # Classificações (dados derivados dos resultados)
+    def get_standings(self, kind, season_id, force=False):
+        """Classificação de "drivers" ou "teams" da temporada, reaproveitando a última busca dentro do TTL."""
+        key = (kind, _normalize_id(season_id))
+        with self._standings_lock:
+            cached = self._standings.get(key)
+        if not force and cached and (time.monotonic() - cached[0]) <= self.ttl:
+            return cached[1]
+
+        if kind == "drivers":
+            response = self.api_client.get_driver_standings(season_id)
+        else:
+            response = self.api_client.get_team_standings(season_id)
+        if isinstance(response, list):
+            with self._standings_lock:
+                self._standings[key] = (time.monotonic(), response)
+        return response
+
+    def invalidate_standings(self, season_id=None):
+        """Descarta as classificações de uma temporada (ou de todas, se season_id for None)."""
+        with self._standings_lock:
+            if season_id is None:
+                self._standings.clear()
+            else:
+                season_id = _normalize_id(season_id)
+                for key in [k for k in self._standings if k[1] == season_id]:
+                    del self._standings[key]
+
+    def _season_of_race(self, race_id):
+        race = self.races.get(race_id)
+        return race.get("season_id") if race else None
+
+    def _on_mutation(self, method, endpoint, data, response):
+        """Aplica no cache local o efeito de um POST/PUT/DELETE bem-sucedido."""
+        parts = endpoint.split("/")
+        name = parts[0]
+        repo = self.repository(name)
+        if repo is None:
+            return
+        item_id = parts[1] if len(parts) > 1 else None
+
+        old_item = repo.get(item_id) if item_id is not None else None
+        new_item = response if isinstance(response, dict) and "id" in response else None
+
+        if method == "DELETE":
+            repo.remove(item_id)
+            for dependent in _DELETE_CASCADES.get(name, ()):
+                getattr(self, dependent).invalidate()
+        elif new_item is not None:
+            repo.upsert(new_item)
+        else:
+            # Resposta sem o item gravado: a próxima leitura busca a coleção novamente
+            repo.invalidate()
+
+        self._invalidate_derived(name, method, old_item, new_item)
+
+    def _invalidate_derived(self, name, method, old_item, new_item):
+        items = [item for item in (old_item, new_item) if item]
+        if name == "results":
+            self._invalidate_season_standings({self._season_of_race(item.get("race_id")) for item in items})
+        elif name == "races" and method != "POST":
+            self._invalidate_season_standings({item.get("season_id") for item in items})
+        elif name in ("drivers", "teams", "seasons") and method != "POST":
+            # Nomes e pontuações exibidos nas classificações podem ter mudado
+            self.invalidate_standings()
+
+    def _invalidate_season_standings(self, season_ids):
+        # Sem saber a temporada afetada, descarta todas as classificações
+        if not season_ids or None in season_ids:
+            self.invalidate_standings()
+            return
+        for season_id in season_ids:
+            self.invalidate_standings(season_id)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from response_cache import user_cache_dir
+
+# Limite da camada em memória (bytes das imagens já decodificadas e redimensionadas)
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+# Camada em disco: PNGs redimensionados, reaproveitados sem rede dentro do TTL e revalidados depois
+DEFAULT_DISK_TTL = 24 * 3600
+DEFAULT_DISK_MAX_BYTES = 200 * 1024 * 1024
+
+def cache_key(url, size):
+    return (url, tuple(size))
+
+def image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+class MemoryImageCache:
+    """LRU de imagens PIL limitado pela soma dos bytes dos pixels."""
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict() # {(url, size): imagem}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            img = self._items.get(key)
+            if img is not None:
+                self._items.move_to_end(key)
+            return img
+
+    def put(self, key, img):
+        nbytes = image_nbytes(img)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= image_nbytes(old)
+            self._items[key] = img
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= image_nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+class DiskEntry:
+    def __init__(self, image, etag, last_modified, stored_at):
+        self.image = image
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+class DiskImageCache:
+    """PNGs redimensionados em disco, com os validadores (ETag/Last-Modified) da imagem original."""
+
+    def __init__(self, directory=None, ttl=DEFAULT_DISK_TTL, max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.directory = directory or user_cache_dir("images")
+        os.makedirs(self.directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Índice LRU {png: bytes} e total em bytes, montados uma vez a partir do disco
+        self._index = OrderedDict()
+        self._total = 0
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._index[path] = size
+            self._total += size
+
+    def _paths(self, key):
+        url, size = key
+        digest = hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + ".png", base + ".json"
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at <= self.ttl
+
+    def get(self, key):
+        """Devolve a DiskEntry guardada (vencida ou não), ou None."""
+        png_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            img = Image.open(png_path)
+            img.load()
+            os.utime(png_path) # Preserva a ordem LRU entre execuções
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if png_path in self._index:
+                self._index.move_to_end(png_path)
+        return DiskEntry(img, meta.get("etag"), meta.get("last_modified"), meta.get("stored_at", 0))
+
+    def put(self, key, img, etag=None, last_modified=None):
+        png_path, meta_path = self._paths(key)
+        if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            img = img.convert("RGBA")
+        try:
+            with self._lock:
+                img.save(png_path, "PNG")
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"url": key[0], "etag": etag, "last_modified": last_modified,
+                               "stored_at": time.time()}, f)
+                size = os.path.getsize(png_path)
+                self._total += size - self._index.pop(png_path, 0)
+                self._index[png_path] = size
+                if self._total > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            print(f"ERRO: Falha ao gravar imagem em cache para {key[0]}: {e}")
+
+    def touch(self, key):
+        """Renova o TTL de uma entrada revalidada pelo servidor (304)."""
+        _, meta_path = self._paths(key)
+        try:
+            with self._lock:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["stored_at"] = time.time()
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+        except (OSError, ValueError) as e:
+            print(f"ERRO: Falha ao atualizar imagem em cache para {key[0]}: {e}")
+
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith((".png", ".json")):
+                    os.remove(os.path.join(self.directory, name))
+            self._index.clear()
+            self._total = 0
+
+    def _evict(self):
+        # Chamado com o lock adquirido: remove os PNGs usados há mais tempo até caber no limite
+        while self._index and self._total > self.max_bytes:
+            path, size = self._index.popitem(last=False)
+            for victim in (path, path[:-4] + ".json"):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            self._total -= size
@@ -0,0 +1,302 @@
+import multiprocessing
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image, ImageTk
+
+from image_cache import MemoryImageCache, DiskImageCache, cache_key
+
+# Downloads/decodificações simultâneos de imagens
+IMAGE_MAX_WORKERS = 4
+IMAGE_TIMEOUT = 5
+# Tamanho máximo (bytes) de uma imagem baixada; downloads maiores são interrompidos
+IMAGE_MAX_BYTES = 5 * 1024 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
+# Tamanhos gerados juntos, em uma só decodificação, para cada URL: cards e pré-visualização dos formulários
+THUMBNAIL_VARIANTS = ((100, 100), (200, 200))
+
+_executor = None
+_session = None
+_lock = threading.Lock()
+_memory_cache = MemoryImageCache()
+_disk_cache = None # DiskImageCache opcional, ativado por enable_image_disk_cache()
+_process_pool = None # ProcessPoolExecutor opcional para decodificar/redimensionar, ativado por enable_process_decode()
+
+def enable_image_disk_cache(directory=None, **kwargs):
+    """Ativa a camada em disco do cache de imagens (kwargs: ttl, max_bytes). Devolve o cache ou None."""
+    global _disk_cache
+    try:
+        _disk_cache = DiskImageCache(directory, **kwargs)
+    except OSError as e:
+        print(f"ERRO: Cache de imagens em disco indisponível: {e}")
+        _disk_cache = None
+    return _disk_cache
+
+def disable_image_disk_cache():
+    global _disk_cache
+    _disk_cache = None
+
+def clear_image_cache():
+    _memory_cache.clear()
+    if _disk_cache is not None:
+        _disk_cache.clear()
+
+class ImageTooLargeError(ValueError):
+    pass
+
+class ImageRequestCancelled(Exception):
+    pass
+
+def _read_limited(response, max_bytes=IMAGE_MAX_BYTES, is_cancelled=None):
+    """Lê o corpo de uma resposta em streaming, desistindo assim que passar de max_bytes
+    ou quando is_cancelled() indicar que o pedido foi substituído."""
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ImageTooLargeError(f"Image is larger than {max_bytes // 1024} KB ({int(declared) // 1024} KB).")
+    data = bytearray()
+    for chunk in response.iter_content(IMAGE_CHUNK_SIZE):
+        if is_cancelled is not None and is_cancelled():
+            raise ImageRequestCancelled()
+        data.extend(chunk)
+        if len(data) > max_bytes:
+            raise ImageTooLargeError(f"Image is larger than {max_bytes // 1024} KB.")
+    return bytes(data)
+
+def enable_process_decode(max_workers=None):
+    """Passa a decodificar e redimensionar as imagens baixadas em um pool de processos (padrão: um por núcleo)."""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            # spawn: os workers nascem de uma thread do loader em um processo com várias threads
+            # (Tk, requests); com fork poderiam herdar locks presos e travar
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+def disable_process_decode():
+    global _process_pool
+    with _lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+def _discard_process_pool(pool):
+    global _process_pool
+    with _lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+def decode_thumbnail(content, size):
+    """Decodifica a imagem já reduzida para caber em size.
+
+    A imagem é aberta sem carregar os pixels e o thumbnail do Pillow reduz primeiro por fator
+    inteiro (draft do decodificador para JPEGs, reduce para os demais formatos); só o passo
+    final usa LANCZOS.
+    """
+    img = Image.open(BytesIO(content))
+    img.thumbnail(size, Image.LANCZOS)
+    img.load()
+    return img
+
+def _fits(size, container):
+    return size[0] <= container[0] and size[1] <= container[1]
+
+def _variant_sizes(size):
+    """size e as variantes padrão, da maior para a menor área."""
+    return sorted({tuple(size)} | set(THUMBNAIL_VARIANTS), key=lambda s: s[0] * s[1], reverse=True)
+
+def _derive(img, size):
+    # Reduz uma variante maior já decodificada, sem voltar ao original
+    img = img.copy()
+    img.thumbnail(size, Image.LANCZOS)
+    return img
+
+def decode_variants(content, sizes):
+    """Decodifica a imagem uma vez, no maior tamanho, e deriva dela os menores. Devolve {size: imagem}."""
+    sizes = sorted(sizes, key=lambda s: s[0] * s[1], reverse=True)
+    largest = decode_thumbnail(content, sizes[0])
+    variants = {sizes[0]: largest}
+    for size in sizes[1:]:
+        variants[size] = _derive(largest, size) if _fits(size, sizes[0]) else decode_thumbnail(content, size)
+    return variants
+
+def encode_thumbnails(content, sizes):
+    """Como decode_variants, mas devolve {size: bytes PPM (PNG se houver transparência)}, prontos
+    para tk.PhotoImage(data=...). Roda nos processos do pool: recebe e devolve só bytes."""
+    encoded = {}
+    for size, img in decode_variants(content, sizes).items():
+        buffer = BytesIO()
+        if img.mode in ("RGBA", "LA") or "transparency" in img.info:
+            img.convert("RGBA").save(buffer, "PNG")
+        else:
+            img.convert("RGB").save(buffer, "PPM")
+        encoded[size] = buffer.getvalue()
+    return encoded
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IMAGE_MAX_WORKERS, thread_name_prefix="image-loader")
+    return _executor
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=IMAGE_MAX_WORKERS, pool_maxsize=IMAGE_MAX_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def fetch_thumbnail(url, size, is_cancelled=None):
+    """Imagem reduzida para caber em size, do cache (memória, depois disco) ou da rede. Roda fora da thread do Tk."""
+    return _fetch_thumbnail(url, size, is_cancelled)[0]
+
+def _fetch_thumbnail(url, size, is_cancelled=None):
+    # Devolve (imagem PIL, bytes para PhotoImage(data=...) ou None); os bytes só existem quando a
+    # imagem acabou de ser decodificada no pool de processos
+    key = cache_key(url, size)
+    img = _memory_cache.get(key)
+    if img is None:
+        img = _from_larger_variant(url, size)
+        if img is not None:
+            _memory_cache.put(key, img)
+    if img is not None:
+        return img, None
+
+    entry = _disk_cache.get(key) if _disk_cache is not None else None
+    if entry is not None and _disk_cache.is_fresh(entry):
+        _memory_cache.put(key, entry.image)
+        return entry.image, None
+
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    # stream=True: o corpo só é lido (até IMAGE_MAX_BYTES) depois de conferir o status
+    with _get_session().get(url, headers=headers, timeout=IMAGE_TIMEOUT, stream=True) as response:
+        if response.status_code == 304 and entry is not None:
+            _disk_cache.touch(key)
+            _memory_cache.put(key, entry.image)
+            return entry.image, None
+        response.raise_for_status()
+        content = _read_limited(response, is_cancelled=is_cancelled)
+
+    # Uma decodificação gera todas as variantes; quem pedir outro tamanho depois não baixa nem decodifica
+    sizes = _variant_sizes(size)
+    data = None
+    pool = _process_pool
+    variants = None
+    if pool is not None:
+        try:
+            encoded = pool.submit(encode_thumbnails, content, sizes).result()
+            variants = {s: Image.open(BytesIO(b)) for s, b in encoded.items()} # Miniaturas: decodificá-las aqui é barato
+            data = encoded[tuple(size)]
+        except BrokenProcessPool as e:
+            # Um worker morreu: desliga o pool e segue decodificando nesta thread
+            print(f"ERRO: Pool de processos de imagens indisponível, decodificando nas threads: {e}")
+            _discard_process_pool(pool)
+    if variants is None:
+        variants = decode_variants(content, sizes)
+    for variant_size, variant in variants.items():
+        variant.load()
+        variant_key = cache_key(url, variant_size)
+        if _disk_cache is not None:
+            _disk_cache.put(variant_key, variant, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        _memory_cache.put(variant_key, variant)
+    return variants[tuple(size)], data
+
+def _from_larger_variant(url, size):
+    """Deriva size de uma variante maior da mesma URL já no cache em memória, ou None."""
+    for variant_size in sorted(THUMBNAIL_VARIANTS, key=lambda s: s[0] * s[1]):
+        if variant_size != tuple(size) and _fits(size, variant_size):
+            img = _memory_cache.get(cache_key(url, variant_size))
+            if img is not None:
+                return _derive(img, size)
+    return None
+
+def warm_thumbnails(urls, size):
+    """Baixa e guarda no cache as miniaturas de várias URLs (ex.: todas as fotos de pilotos).
+
+    Os downloads usam o pool de threads; com enable_process_decode() a decodificação se espalha
+    pelos núcleos. Devolve os futures, um por URL.
+    """
+    executor = _get_executor()
+    return [executor.submit(fetch_thumbnail, url, size) for url in urls if url]
+
+def cached_thumbnail(url, size):
+    """Imagem já presente no cache em memória, ou None (não acessa disco nem rede)."""
+    return _memory_cache.get(cache_key(url, size))
+
+class ImageRequest:
+    """Pedido de imagem em andamento; cancel() descarta o resultado se ele ainda não foi entregue."""
+
+    def __init__(self, url, size):
+        self.url = url
+        self.size = size
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+def load_image_async(widget, url, size, callback):
+    """Baixa, decodifica e redimensiona a imagem no pool de threads.
+
+    callback(photo, error) é chamado na thread do Tk, via after: photo é um
+    ImageTk.PhotoImage (ou None) e error a exceção ocorrida (ou None). Se a
+    imagem já estiver no cache em memória, callback é chamado antes de retornar.
+    """
+    request = ImageRequest(url, size)
+
+    def deliver(img, error, data=None):
+        # O widget pode ter sido destruído ou o pedido substituído enquanto baixava
+        if request.cancelled or not widget.winfo_exists():
+            return
+        request.done = True
+        photo = None
+        if img is not None:
+            try:
+                # Bytes PPM/PNG vindos do pool de processos: o Tk cria a imagem direto, sem passar pelo PIL
+                photo = tk.PhotoImage(master=widget, data=data) if data is not None else ImageTk.PhotoImage(img)
+            except Exception as e:
+                error = e
+        callback(photo, error)
+
+    def work():
+        if request.cancelled:
+            return
+        img, data, error = None, None, None
+        try:
+            img, data = _fetch_thumbnail(url, size, is_cancelled=lambda: request.cancelled)
+        except Exception as e:
+            error = e
+        if request.cancelled:
+            return
+        try:
+            # Agenda na janela principal: o after de um widget destruído nunca dispararia
+            widget.winfo_toplevel().after(0, lambda: deliver(img, error, data))
+        except (RuntimeError, tk.TclError):
+            pass # Tk já encerrado ou widget destruído
+
+    cached = cached_thumbnail(url, size)
+    if cached is not None:
+        # Já decodificada e redimensionada: entrega na hora, sem passar pelo pool
+        deliver(cached, None)
+        return request
+
+    _get_executor().submit(work)
+    return request
@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 
-from api_client import ApiClient
+from api_client import ApiClient, enable_disk_cache
+from entity_store import EntityStore
+from image_loader import enable_image_disk_cache, enable_process_decode
 
 from views.welcome_view import WelcomeView
 from views.driver_view import DriverListView, AddDriverView, EditDriverView
@@ -12,20 +14,32 @@ from views.race_view import RaceListView, AddRaceView, EditRaceView
 from views.driver_contract_view import ContractListView, AddContractView, EditContractView
 from views.result_view import ResultListView, AddResultView, EditResultView
 from views.overall_standings_view import OverallStandingsView
+from views.network_inspector_view import NetworkInspectorView
 
 from ui_elements import COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_BUTTON_TEXT, COLOR_DANGER_ACCENT, COLOR_BACKGROUND_MEDIUM, COLOR_BACKGROUND_LIGHT, COLOR_FOREGROUND_DARK, \
     COLOR_BORDER_FOCUS
 
 class F1App(tk.Tk):
-    def __init__(self):
+    def __init__(self, use_disk_cache=True, stale_while_revalidate=True, process_image_decode=False):
         super().__init__()
         self.title("Sistema de Gestão da F1")
         self.geometry("1280x720")
         self.configure(bg=COLOR_BACKGROUND_DARK)
 
         self._apply_styles()
+        if use_disk_cache:
+            # Guarda respostas GET e imagens em disco para que as listas abram com os últimos dados conhecidos
+            enable_disk_cache()
+            enable_image_disk_cache()
+        if process_image_decode:
+            # Decodificação/redimensionamento das imagens em processos separados, fora do GIL do Tk
+            enable_process_decode()
         self.api_client = ApiClient()
+        # Coleções compartilhadas entre as views (pilotos, equipes, temporadas...)
+        self.entity_store = EntityStore(self.api_client)
+        # Listas exibem os dados já conhecidos na hora e revalidam em segundo plano
+        self.stale_while_revalidate = stale_while_revalidate
 
         # Mapeamento de nomes de views para suas classes
         self.view_classes = {
@@ -54,8 +68,10 @@ class F1App(tk.Tk):
             "ResultListView": ResultListView,
             "AddResultView": AddResultView,
             "EditResultView": EditResultView,
+            "NetworkInspectorView": NetworkInspectorView,
         }
         self._view_instances = {} # Armazenará as instâncias das views já criadas
+        self._current_frame = None # View exibida no momento
 
         self._setup_container() # O container para as views
         self.show_frame("WelcomeView")
@@ -132,6 +148,11 @@ class F1App(tk.Tk):
         self.container.grid_columnconfigure(0, weight=1)
 
     def show_frame(self, page_name, **kwargs):
+        # Avisa a view que está saindo da tela (ex.: para cancelar downloads pendentes)
+        previous = self._current_frame
+        if previous is not None and callable(getattr(previous, 'on_hide', None)):
+            previous.on_hide()
+
         # Esconde todas as views atualmente visíveis
         for frame in self._view_instances.values():
             frame.grid_remove()
@@ -149,6 +170,7 @@ class F1App(tk.Tk):
         frame = self._view_instances[page_name]
         frame.grid(row=0, column=0, sticky="nsew")
         frame.tkraise()
+        self._current_frame = frame
 
         # Chama o método on_show da view, passando todos os kwargs
         # Cada view será responsável por interpretar esses kwargs e carregar seus próprios dados
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+APP_NAME = "f1-frontend"
+
+# Incrementar quando o formato das entradas mudar; chaves de versões antigas são descartadas
+CACHE_VERSION = 1
+DEFAULT_TTL = 7 * 24 * 3600 # Entradas mais antigas que isso não são reaproveitadas
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+def user_cache_dir(subdir=None):
+    """Diretório de cache do usuário para a aplicação, criado se necessário."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, APP_NAME, subdir) if subdir else os.path.join(base, APP_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class ResponseCache:
+    """Cache em disco (SQLite) das respostas GET da API, com TTL e limite de tamanho (expulsão LRU)."""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(user_cache_dir(), "responses.sqlite3")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+                " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            # Remove entradas gravadas por outras versões do formato
+            self._conn.execute("DELETE FROM responses WHERE key NOT LIKE ?", (self._key("") + "%",))
+
+    @staticmethod
+    def _key(url):
+        return f"v{CACHE_VERSION}:{url}"
+
+    def get(self, url):
+        """Devolve (corpo JSON bruto, etag, last_modified) da última resposta guardada, ou None."""
+        now = time.time()
+        key = self._key(url)
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                body, etag, last_modified, stored_at = row
+                if now - stored_at > self.ttl:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return body, etag, last_modified
+        except sqlite3.Error as e:
+            print(f"ERRO: Falha ao ler cache em disco para {url}: {e}")
+            return None
+
+    def set(self, url, body, etag=None, last_modified=None):
+        """Guarda o corpo JSON bruto (str ou bytes) da resposta, sem decodificá-lo."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, accessed_at, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self._key(url), body, etag, last_modified, now, now, len(body)),
+                )
+                self._evict()
+        except sqlite3.Error as e:
+            print(f"ERRO: Falha ao gravar cache em disco para {url}: {e}")
+
+    def touch(self, url):
+        """Renova uma entrada revalidada pelo servidor (304) sem regravar o corpo."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, self._key(url))
+                )
+        except sqlite3.Error as e:
+            print(f"ERRO: Falha ao atualizar cache em disco para {url}: {e}")
+
+    def delete(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (self._key(url),))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        # Chamado com o lock adquirido: remove as entradas menos usadas até caber no limite
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
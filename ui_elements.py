@@ -2,10 +2,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import requests
-from io import BytesIO
 from datetime import datetime
 import os
 
+from image_loader import load_image_async
+
 COLOR_BACKGROUND_DARK = "#1A1A1A"
 COLOR_BACKGROUND_MEDIUM = "#2B2B2B"
 COLOR_BACKGROUND_LIGHT = "#3A3A3A"
@@ -20,9 +21,22 @@ COLOR_DANGER_ACCENT = "#FF4500"
 COLOR_BUTTON_TEXT = "white"
 COLOR_BORDER_FOCUS = "#FF8C00"
 
+# Pausa na digitação (ms) antes de a pré-visualização baixar a URL informada
+PREVIEW_DEBOUNCE_MS = 500
+
 ICONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
 
+# Ícones já carregados, compartilhados por todos os widgets: {(nome, tamanho): PhotoImage ou None}
+_icon_cache = {}
+
 def load_icon(icon_name, size=(24, 24)):
+    """PhotoImage do ícone redimensionado, decodificado uma única vez por (nome, tamanho)."""
+    key = (icon_name, tuple(size))
+    if key not in _icon_cache:
+        _icon_cache[key] = _read_icon(icon_name, size)
+    return _icon_cache[key]
+
+def _read_icon(icon_name, size):
     icon_path = os.path.join(ICONS_PATH, f"{icon_name}.png")
     if os.path.exists(icon_path):
         try:
@@ -187,8 +201,32 @@ class ImagePreview(tk.Frame):
         else:
             self.image_label.config(text="Sem Imagem", fg=COLOR_FOREGROUND_DARK)
         self.image = None
+        self._pending = None # Pedido de imagem em andamento (image_loader.ImageRequest)
+        self._url = None
+        self._debounce_job = None
+
+    def is_showing(self, url):
+        """True se a imagem de url já está exibida (ou sendo carregada)."""
+        return bool(url) and url == self._url and (self.image is not None or self._pending is not None)
+
+    def schedule_load(self, url, delay_ms=None):
+        """Carrega url só depois de delay_ms sem novas chamadas (ex.: enquanto o usuário digita a URL)."""
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+        self._debounce_job = self.after(PREVIEW_DEBOUNCE_MS if delay_ms is None else delay_ms,
+                                        lambda: self.load_image_from_url(url))
 
     def load_image_from_url(self, url):
+        """Exibe o placeholder e carrega a imagem em segundo plano, substituindo-o quando pronta."""
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+            self._debounce_job = None
+        if self.is_showing(url):
+            return
+        self._url = url
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
         self.image_label.config(image='')
         self.image = None
 
@@ -199,27 +237,48 @@ class ImagePreview(tk.Frame):
                 self.image_label.config(text="Sem Imagem", fg=COLOR_FOREGROUND_DARK)
             return
 
-        self.image_label.config(text="Carregando...", fg=COLOR_FOREGROUND_DARK)
-        try:
-            response = requests.get(url, stream=True, timeout=5)
-            response.raise_for_status()
-            image_data = response.content
-            img = Image.open(BytesIO(image_data))
-            img.thumbnail(self.max_size, Image.LANCZOS)
-            self.image = ImageTk.PhotoImage(img)
+        if self.default_photo_image:
+            self.image_label.config(image=self.default_photo_image, text="")
+        else:
+            self.image_label.config(text="Carregando...", fg=COLOR_FOREGROUND_DARK)
+        request = load_image_async(self, url, self.max_size,
+                                   lambda photo, error: self._on_image_loaded(url, photo, error))
+        if not request.done:
+            self._pending = request
+
+    def cancel_loading(self):
+        """Cancela o download em andamento, se houver. Devolve True se algo foi cancelado."""
+        if self._pending is None:
+            return False
+        self._pending.cancel()
+        self._pending = None
+        return True
+
+    def destroy(self):
+        # Cards recriados a cada recarga: não baixa imagens de widgets que já saíram da tela
+        self.cancel_loading()
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+            self._debounce_job = None
+        super().destroy()
+
+    def _on_image_loaded(self, url, photo, error):
+        self._pending = None
+        if photo is not None:
+            self.image = photo
             self.image_label.config(image=self.image, text="")
-        except requests.exceptions.RequestException as e:
-            if self.default_photo_image:
-                self.image_label.config(image=self.default_photo_image, text="")
-            else:
-                self.image_label.config(text="Erro ao carregar", fg=COLOR_DANGER_ACCENT)
-            print(f"ERRO: Falha ao carregar imagem: {e.args[0] if e.args else e}. URL: {url}")
-        except Exception as e:
-            if self.default_photo_image:
-                self.image_label.config(image=self.default_photo_image, text="")
-            else:
-                self.image_label.config(text="Erro processamento", fg=COLOR_DANGER_ACCENT)
-            print(f"ERRO: Falha ao processar imagem: {e}. URL: {url}")
+            return
+
+        if self.default_photo_image:
+            self.image_label.config(image=self.default_photo_image, text="")
+        elif isinstance(error, requests.exceptions.RequestException):
+            self.image_label.config(text="Erro ao carregar", fg=COLOR_DANGER_ACCENT)
+        else:
+            self.image_label.config(text="Erro processamento", fg=COLOR_DANGER_ACCENT)
+        if isinstance(error, requests.exceptions.RequestException):
+            print(f"ERRO: Falha ao carregar imagem: {error.args[0] if error.args else error}. URL: {url}")
+        else:
+            print(f"ERRO: Falha ao processar imagem: {error}. URL: {url}")
 
 def show_info(title, message):
     messagebox.showinfo(title, message)
@@ -252,18 +311,45 @@ class AppHeaderFrame(tk.Frame):
         self.title_label = tk.Label(self, text=title_text, font=("Arial", 20, "bold"), bg=bg_color, fg=fg_color)
         self.title_label.grid(row=0, column=1, padx=15, pady=10, sticky="w")
 
-class BaseEntityCard(tk.Frame):
-    def __init__(self, parent, item_data, controller, 
-                 item_id_key="id", image_url_key=None, title_key=None, detail_lines_info=None,
-                 edit_view_name=None, delete_api_call=None, refresh_list_view_callback=None, 
-                 bg_color=COLOR_BACKGROUND_MEDIUM, fg_color=COLOR_FOREGROUND_LIGHT, **kwargs_for_tk_frame):
-        
-        super().__init__(parent, bg=bg_color, relief="flat", bd=0, highlightthickness=0, **kwargs_for_tk_frame)
+class RefreshIndicator(tk.Label):
+    """Aviso discreto de atualização em segundo plano, sobreposto ao canto do conteúdo já exibido."""
 
-        self.controller = controller
-        self.item_data = item_data
-        self.item_id = item_data.get(item_id_key)
+    def __init__(self, parent, text="Atualizando...", **kwargs):
+        super().__init__(parent, text=text, font=("Arial", 9, "italic"),
+                         bg=parent.cget('bg'), fg=COLOR_FOREGROUND_DARK, **kwargs)
+        self._text = text
+
+    def start(self):
+        self.config(text=self._text, fg=COLOR_FOREGROUND_DARK)
+        self.place(relx=1.0, rely=0.0, anchor="ne")
+        self.lift()
+
+    def stop(self):
+        self.place_forget()
 
+    def fail(self, message):
+        """Mantém o aviso na tela, agora com a falha da atualização, até o próximo start/stop."""
+        self.config(text=f"Não foi possível atualizar: {message}", fg=COLOR_DANGER_ACCENT)
+        self.place(relx=1.0, rely=0.0, anchor="ne")
+        self.lift()
+
+def report_load_error(message, refresh_indicator, content):
+    """Erro ao carregar uma lista: com dados do cache já em content, só avisa no indicador (sem diálogo)."""
+    if content.winfo_manager():
+        refresh_indicator.fail(message)
+    else:
+        show_error("Erro", message)
+
+class EntityCardSpec:
+    """Textos, imagem e ações (Editar/Excluir) de um tipo de card.
+
+    Compartilhada pelo BaseEntityCard e pela CanvasCardGrid, que desenha os cards
+    diretamente no canvas, sem widgets.
+    """
+
+    def __init__(self, controller, item_id_key="id", image_url_key=None, title_key=None, detail_lines_info=None,
+                 edit_view_name=None, delete_api_call=None, refresh_list_view_callback=None):
+        self.controller = controller
         self.item_id_key = item_id_key
         self.image_url_key = image_url_key
         self.title_key = title_key
@@ -272,6 +358,56 @@ class BaseEntityCard(tk.Frame):
         self.delete_api_call = delete_api_call
         self.refresh_list_view_callback = refresh_list_view_callback
 
+    def title(self, item_data):
+        return item_data.get(self.title_key, "")
+
+    def detail_texts(self, item_data):
+        texts = []
+        for prefix, data_key, formatter in self.detail_lines_info:
+            value = item_data.get(data_key, 'N/A')
+            display_value = formatter(value) if formatter else str(value)
+            texts.append(f"{prefix}{display_value}")
+        return texts
+
+    def image_url(self, item_data):
+        return item_data.get(self.image_url_key, "")
+
+    def edit(self, item_data):
+        if self.edit_view_name:
+            param_name = f"{self.edit_view_name.replace('Edit', '').replace('View', '').lower()}_id"
+            self.controller.show_frame(self.edit_view_name, **{param_name: item_data.get(self.item_id_key)})
+
+    def delete(self, item_data):
+        item_id = item_data.get(self.item_id_key)
+        if ask_yes_no("Confirmar Exclusão", f"Tem certeza que deseja excluir '{item_data.get(self.title_key, item_id)}' (ID: {item_id})?"):
+            if self.delete_api_call:
+                response = self.delete_api_call(item_id)
+                if response is True:
+                    show_info("Sucesso", "Item excluído com sucesso!")
+                    if self.refresh_list_view_callback:
+                        self.refresh_list_view_callback()
+                else:
+                    show_error("Erro", response.get("error", "Falha ao excluir item. (Verifique o console para detalhes)"))
+
+class BaseEntityCard(tk.Frame):
+    def __init__(self, parent, item_data, controller,
+                 item_id_key="id", image_url_key=None, title_key=None, detail_lines_info=None,
+                 edit_view_name=None, delete_api_call=None, refresh_list_view_callback=None,
+                 bg_color=COLOR_BACKGROUND_MEDIUM, fg_color=COLOR_FOREGROUND_LIGHT, lazy_image=False, spec=None, **kwargs_for_tk_frame):
+
+        super().__init__(parent, bg=bg_color, relief="flat", bd=0, highlightthickness=0, **kwargs_for_tk_frame)
+
+        # Uma EntityCardSpec em spec substitui os parâmetros item_id_key ... refresh_list_view_callback
+        if spec is None:
+            spec = EntityCardSpec(controller, item_id_key, image_url_key, title_key, detail_lines_info,
+                                  edit_view_name, delete_api_call, refresh_list_view_callback)
+        self.spec = spec
+        self.controller = controller
+        self.item_data = item_data
+        self.item_id = item_data.get(spec.item_id_key)
+        self.image_url_key = spec.image_url_key
+        self.lazy_image = lazy_image
+
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -280,20 +416,24 @@ class BaseEntityCard(tk.Frame):
         if self.image_url_key:
             self.image_preview = ImagePreview(self, label_text="", max_size=(100, 100), bg=bg_color)
             self.image_preview.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
-            self.image_preview.load_image_from_url(self.item_data.get(self.image_url_key, ""))
+            # Com lazy_image, quem controla a grade chama load_image() quando o card ficar visível
+            if not lazy_image:
+                self.load_image()
 
         self.details_frame = tk.Frame(self, bg=bg_color)
         self.details_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nw")
 
-        if self.title_key:
-            ttk.Label(self.details_frame, text=self.item_data.get(self.title_key, ""),
-                      font=("Arial", 12, "bold"), style="CardTitle.TLabel").pack(anchor="w", pady=2)
-        
-        for prefix, data_key, formatter in self.detail_lines_info:
-            value = self.item_data.get(data_key, 'N/A')
-            display_value = formatter(value) if formatter else str(value)
-            ttk.Label(self.details_frame, text=f"{prefix}{display_value}",
-                      font=("Arial", 10), style="CardDetail.TLabel").pack(anchor="w")
+        self.title_label = None
+        if spec.title_key:
+            self.title_label = ttk.Label(self.details_frame, text=spec.title(self.item_data),
+                                         font=("Arial", 12, "bold"), style="CardTitle.TLabel")
+            self.title_label.pack(anchor="w", pady=2)
+
+        self.detail_labels = []
+        for text in spec.detail_texts(self.item_data):
+            label = ttk.Label(self.details_frame, text=text, font=("Arial", 10), style="CardDetail.TLabel")
+            label.pack(anchor="w")
+            self.detail_labels.append(label)
 
         action_frame = tk.Frame(self, bg=bg_color)
         action_frame.grid(row=1, column=0, columnspan=2, pady=5, sticky="ew")
@@ -306,18 +446,33 @@ class BaseEntityCard(tk.Frame):
         delete_btn = ttk.Button(action_frame, text="Excluir", command=self._delete_item, style="Delete.TButton")
         delete_btn.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
+    def bind_item(self, item_data):
+        """Reaproveita o card para outro item, atualizando textos e imagem sem recriar widgets."""
+        if item_data == self.item_data:
+            return
+        self.item_data = item_data
+        self.item_id = item_data.get(self.spec.item_id_key)
+        if self.title_label is not None:
+            self.title_label.config(text=self.spec.title(item_data))
+        for label, text in zip(self.detail_labels, self.spec.detail_texts(item_data)):
+            label.config(text=text)
+
+        if self.image_url_key:
+            if not self.lazy_image:
+                self.load_image()
+            elif not self.image_preview.is_showing(self.spec.image_url(item_data)):
+                self.image_preview.load_image_from_url("") # Placeholder até a grade pedir a nova imagem
+
+    def load_image(self):
+        if self.image_url_key:
+            self.image_preview.load_image_from_url(self.spec.image_url(self.item_data))
+
+    def cancel_image(self):
+        """Cancela o download da imagem em andamento. Devolve True se havia um."""
+        return bool(self.image_url_key) and self.image_preview.cancel_loading()
+
     def _edit_item(self):
-        if self.edit_view_name:
-            param_name = f"{self.edit_view_name.replace('Edit', '').replace('View', '').lower()}_id"
-            self.controller.show_frame(self.edit_view_name, **{param_name: self.item_id})
+        self.spec.edit(self.item_data)
 
     def _delete_item(self):
-        if ask_yes_no("Confirmar Exclusão", f"Tem certeza que deseja excluir '{self.item_data.get(self.title_key, self.item_id)}' (ID: {self.item_id})?"):
-            if self.delete_api_call:
-                response = self.delete_api_call(self.item_id)
-                if response is True:
-                    show_info("Sucesso", "Item excluído com sucesso!")
-                    if self.refresh_list_view_callback:
-                        self.refresh_list_view_callback()
-                else:
-                    show_error("Erro", response.get("error", "Falha ao excluir item. (Verifique o console para detalhes)"))
\ No newline at end of file
+        self.spec.delete(self.item_data)
\ No newline at end of file
@@ -2,16 +2,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading # Importar o módulo threading
 
-from api_client import ApiClient
 from ui_elements import LabeledEntry, ImagePreview, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
-    COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_BACKGROUND_LIGHT, AppHeaderFrame # Importar AppHeaderFrame
+    COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_BACKGROUND_LIGHT, AppHeaderFrame, RefreshIndicator, report_load_error
+from virtual_tree import VirtualTreeview
 
 class CircuitListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.circuits = []
 
         self.create_widgets()
@@ -26,7 +26,7 @@ class CircuitListView(tk.Frame):
         button_frame.pack(pady=10)
         ttk.Button(button_frame, text="Adicionar Novo Circuito", command=self.add_circuit, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         # O botão "Atualizar Lista" agora chamará o método que inicia o carregamento assíncrono
-        ttk.Button(button_frame, text="Atualizar Lista", command=self.load_circuits, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Lista", command=lambda: self.load_circuits(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
         # Container para o indicador de carregamento e o Treeview
         self.content_container = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
@@ -36,6 +36,7 @@ class CircuitListView(tk.Frame):
         self.loading_label = ttk.Label(self.content_container, text="Carregando circuitos...", 
                                        background=COLOR_BACKGROUND_DARK, foreground=COLOR_FOREGROUND_LIGHT,
                                        font=("Arial", 12, "bold"))
+        self.refresh_indicator = RefreshIndicator(self.content_container)
         # O loading_label será empacotado/desempacotado dinamicamente
 
         # Configuração de Estilos (pode ser movida para o main.py se for global)
@@ -44,7 +45,7 @@ class CircuitListView(tk.Frame):
         style.configure("Treeview", font=("Arial", 10), rowheight=28, background=COLOR_BACKGROUND_MEDIUM, foreground=COLOR_FOREGROUND_LIGHT, fieldbackground=COLOR_BACKGROUND_MEDIUM)
         style.map('Treeview', background=[('selected', COLOR_PRIMARY_ACCENT)], foreground=[('selected', 'white')])
 
-        self.tree = ttk.Treeview(self.content_container, columns=("ID", "Nome", "País", "Comprimento (km)", "URL Imagem", "URL Mapa"), show="headings")
+        self.tree = VirtualTreeview(self.content_container, columns=("ID", "Nome", "País", "Comprimento (km)", "URL Imagem", "URL Mapa"))
         self.tree.heading("ID", text="ID")
         self.tree.heading("Nome", text="Nome")
         self.tree.heading("País", text="País")
@@ -73,20 +74,35 @@ class CircuitListView(tk.Frame):
     # NOVO: Método chamado pelo Controller quando esta tela é exibida
     def on_show(self, **kwargs):
         """Carrega os dados dos circuitos quando a CircuitListView é exibida."""
+        self.tree.resume_fill()
         self.load_circuits() # load_circuits() agora inicia uma thread
 
+    def on_hide(self):
+        """Interrompe o preenchimento da tabela ao sair da tela; on_show o retoma."""
+        self.tree.cancel_fill()
+
     # ATUALIZADO: Este método agora inicia o carregamento em uma thread separada
-    def load_circuits(self):
-        # 1. Esconde o treeview e mostra o indicador de carregamento
-        self.tree.pack_forget()
-        self.loading_label.pack(pady=10)
+    def load_circuits(self, force=False):
+        repo = self.controller.entity_store.circuits
+        cached = repo.peek() if self.controller.stale_while_revalidate else None
+        if cached:
+            # Exibe a última lista conhecida; a API só é consultada se ela estiver vencida
+            self._handle_circuits_response(cached)
+            if not force and not repo.is_stale():
+                return
+            self.refresh_indicator.start()
+        else:
+            # 1. Esconde o treeview e mostra o indicador de carregamento
+            self.tree.pack_forget()
+            self.loading_label.pack(pady=10)
         
         # 2. Inicia a operação da API em uma nova thread
-        threading.Thread(target=self._fetch_circuits_async, daemon=True).start()
+        threading.Thread(target=self._fetch_circuits_async, args=(force,), daemon=True).start()
 
-    def _fetch_circuits_async(self):
+    def _fetch_circuits_async(self, force):
         """Método para buscar os circuitos da API em uma thread separada."""
-        response = self.api_client.get_circuits()
+        with self.api_client.deadline():
+            response = self.controller.entity_store.circuits.get_all(force=force)
         # 3. Usa self.after para agendar a atualização da UI na thread principal do Tkinter
         self.after(0, lambda: self._handle_circuits_response(response))
 
@@ -94,24 +110,24 @@ class CircuitListView(tk.Frame):
         """Método para processar a resposta da API e atualizar a UI na thread principal."""
         # 4. Esconde o indicador de carregamento
         self.loading_label.pack_forget()
-
-        # 5. Limpa o treeview antes de popular com novos dados
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.refresh_indicator.stop()
 
         if isinstance(response, dict) and "error" in response:
-            show_error("Erro", response.get("error", "Falha ao carregar circuitos."))
+            # Mantém as linhas já exibidas, se houver, e só avisa no indicador
+            report_load_error(response.get("error", "Falha ao carregar circuitos."), self.refresh_indicator, self.tree)
+        elif response == self.circuits and self.tree.winfo_manager():
+            pass # Revalidação sem mudanças: nada a redesenhar
         elif response is not None:
+            # 5. Substitui as linhas do treeview pelos novos dados
             self.circuits = response
-            for circuit in self.circuits:
-                self.tree.insert("", tk.END, values=(
-                    circuit.get("id"),
-                    circuit.get("name"),
-                    circuit.get("country"),
-                    circuit.get("length_km"),
-                    circuit.get("image_url"),
-                    circuit.get("map_url")
-                ))
+            self.tree.set_rows([(
+                circuit.get("id"),
+                circuit.get("name"),
+                circuit.get("country"),
+                circuit.get("length_km"),
+                circuit.get("image_url"),
+                circuit.get("map_url")
+            ) for circuit in self.circuits])
             # 6. Empacota o treeview de volta após carregar os dados
             self.tree.pack(fill=tk.BOTH, expand=True)
         else:
@@ -153,7 +169,7 @@ class AddCircuitView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.create_widgets()
 
     def create_widgets(self):
@@ -228,7 +244,7 @@ class EditCircuitView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.circuit_id = None
         self.create_widgets()
 
@@ -247,6 +263,7 @@ class EditCircuitView(tk.Frame):
         self.image_url_entry = LabeledEntry(form_frame, "URL da Imagem (opcional):")
         self.image_url_entry.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
         self.image_url_entry.entry.bind("<FocusOut>", self.update_image_preview)
+        self.image_url_entry.entry.bind("<KeyRelease>", self.schedule_image_preview)
 
         self.image_preview = ImagePreview(form_frame, label_text="Mapa do Circuito:")
         self.image_preview.grid(row=3, column=0, columnspan=2, sticky="nsew", pady=10)
@@ -293,6 +310,10 @@ class EditCircuitView(tk.Frame):
         url = self.image_url_entry.get()
         self.image_preview.load_image_from_url(url)
 
+    def schedule_image_preview(self, event=None):
+        """Atualiza a pré-visualização quando o usuário para de digitar a URL."""
+        self.image_preview.schedule_load(self.image_url_entry.get())
+
     def save_changes(self):
         data = {
             "name": self.name_entry.get(),
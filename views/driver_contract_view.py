@@ -1,26 +1,25 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from api_client import ApiClient
+import threading
+
 from ui_elements import LabeledEntry, LabeledCombobox, LabeledSpinbox, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_BACKGROUND_LIGHT, AppHeaderFrame # Importar AppHeaderFrame
+from virtual_tree import VirtualTreeview
 
 class ContractListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.contracts = []
         self.seasons_map = {}
         self.teams_map = {}
         self.drivers_map = {}
-        self._load_relations_data()
 
         self.create_widgets()
-        self.load_contracts()
 
-    def _load_relations_data(self):
-        seasons_resp = self.api_client.get_seasons()
+    def _update_relations_maps(self, seasons_resp, teams_resp, drivers_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
             show_error("Erro", seasons_resp.get("error", "Falha ao carregar temporadas para exibição."))
         elif seasons_resp is not None:
@@ -28,7 +27,6 @@ class ContractListView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para temporadas.")
 
-        teams_resp = self.api_client.get_teams()
         if isinstance(teams_resp, dict) and "error" in teams_resp:
             show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para exibição."))
         elif teams_resp is not None:
@@ -36,7 +34,6 @@ class ContractListView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para equipes.")
 
-        drivers_resp = self.api_client.get_drivers()
         if isinstance(drivers_resp, dict) and "error" in drivers_resp:
             show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para exibição."))
         elif drivers_resp is not None:
@@ -51,14 +48,14 @@ class ContractListView(tk.Frame):
         button_frame = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
         button_frame.pack(pady=10)
         ttk.Button(button_frame, text="Adicionar Novo Contrato", command=self.add_contract, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Atualizar Lista", command=self.load_contracts, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Lista", command=lambda: self.load_contracts(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
         style = ttk.Style()
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"), background=COLOR_BACKGROUND_LIGHT, foreground=COLOR_FOREGROUND_LIGHT)
         style.configure("Treeview", font=("Arial", 10), rowheight=28, background=COLOR_BACKGROUND_MEDIUM, foreground=COLOR_FOREGROUND_LIGHT, fieldbackground=COLOR_BACKGROUND_MEDIUM)
         style.map('Treeview', background=[('selected', COLOR_PRIMARY_ACCENT)], foreground=[('selected', 'white')])
 
-        self.tree = ttk.Treeview(self, columns=("ID", "Temporada", "Equipe", "Piloto", "Número", "Salário (MUSD)"), show="headings")
+        self.tree = VirtualTreeview(self, columns=("ID", "Temporada", "Equipe", "Piloto", "Número", "Salário (MUSD)"))
         self.tree.heading("ID", text="ID")
         self.tree.heading("Temporada", text="Temporada")
         self.tree.heading("Equipe", text="Equipe")
@@ -85,20 +82,45 @@ class ContractListView(tk.Frame):
         ttk.Button(self, text="Voltar à Tela Inicial", command=lambda: self.controller.show_frame("WelcomeView"), 
                    style="Monochromatic.TButton").pack(pady=20)
 
-    def load_contracts(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def on_show(self, **kwargs):
+        self.tree.resume_fill()
+        self.load_contracts() # Inclui contratos gravados nas telas de adição/edição
+
+    def on_hide(self):
+        """Interrompe o preenchimento da tabela ao sair da tela; on_show o retoma."""
+        self.tree.cancel_fill()
+
+    def load_contracts(self, force=False):
+        threading.Thread(target=self._fetch_all_data_async, args=(force,), daemon=True).start()
+
+    def _fetch_all_data_async(self, force):
+        """Busca as dependências (temporadas, equipes, pilotos) e os contratos em paralelo."""
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=(store.seasons.get_all, force),
+            teams=(store.teams.get_all, force),
+            drivers=(store.drivers.get_all, force),
+            contracts=(store.contracts.get_all, force),
+        )
 
-        response = self.api_client.get_contracts()
+        self.after(0, lambda: self._handle_all_data(responses))
+
+    def _handle_all_data(self, responses):
+        self._update_relations_maps(responses["seasons"], responses["teams"], responses["drivers"])
+        self._handle_contracts_response(responses["contracts"])
+
+    def _handle_contracts_response(self, response):
         if isinstance(response, dict) and "error" in response:
+            self.tree.clear()
             show_error("Erro", response.get("error", "Falha ao carregar contratos."))
         elif response is not None:
             self.contracts = response
+            rows = []
             for contract in self.contracts:
                 season_year = self.seasons_map.get(contract.get("season_id"), "N/A")
                 team_name = self.teams_map.get(contract.get("team_id"), "N/A")
                 driver_name = self.drivers_map.get(contract.get("driver_id"), "N/A")
-                self.tree.insert("", tk.END, values=(
+                rows.append((
                     contract.get("id"),
                     season_year,
                     team_name,
@@ -106,7 +128,9 @@ class ContractListView(tk.Frame):
                     contract.get("number"),
                     contract.get("salary_musd")
                 ))
+            self.tree.set_rows(rows)
         else:
+            self.tree.clear()
             show_error("Erro", "Resposta inesperada da API.")
 
     def add_contract(self):
@@ -143,35 +167,44 @@ class AddContractView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.seasons_data = {}
         self.teams_data = {}
         self.drivers_data = {}
-        self._load_relations_data()
         self.create_widgets()
 
-    def _load_relations_data(self):
-        seasons_resp = self.api_client.get_seasons()
+    def _fetch_and_populate_relations_async(self):
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=store.seasons.get_all,
+            teams=store.teams.get_all,
+            drivers=store.drivers.get_all,
+        )
+
+        self.after(0, lambda: self._populate_comboboxes(responses["seasons"], responses["teams"], responses["drivers"]))
+
+    def _populate_comboboxes(self, seasons_resp, teams_resp, drivers_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
             show_error("Erro", seasons_resp.get("error", "Falha ao carregar temporadas para seleção."))
         elif seasons_resp is not None:
             self.seasons_data = {s["id"]: s["year"] for s in seasons_resp}
+            self.season_combobox.update_options(self.seasons_data)
         else:
             show_error("Erro", "Resposta inesperada para temporadas.")
 
-        teams_resp = self.api_client.get_teams()
         if isinstance(teams_resp, dict) and "error" in teams_resp:
             show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para seleção."))
         elif teams_resp is not None:
             self.teams_data = {t["id"]: t["name"] for t in teams_resp}
+            self.team_combobox.update_options(self.teams_data)
         else:
             show_error("Erro", "Resposta inesperada para equipes.")
 
-        drivers_resp = self.api_client.get_drivers()
         if isinstance(drivers_resp, dict) and "error" in drivers_resp:
             show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para seleção."))
         elif drivers_resp is not None:
             self.drivers_data = {d["id"]: d["full_name"] for d in drivers_resp}
+            self.driver_combobox.update_options(self.drivers_data)
         else:
             show_error("Erro", "Resposta inesperada para pilotos.")
 
@@ -200,6 +233,14 @@ class AddContractView(tk.Frame):
         ttk.Button(button_frame, text="Salvar", command=self.save_contract, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Cancelar", command=lambda: self.controller.show_frame("ContractListView"), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
+    def on_show(self, **kwargs):
+        self.season_combobox.set_by_name("")
+        self.team_combobox.set_by_name("")
+        self.driver_combobox.set_by_name("")
+        self.salary_entry.set("")
+
+        threading.Thread(target=self._fetch_and_populate_relations_async, daemon=True).start()
+
     def save_contract(self):
         season_id = self.season_combobox.get_id()
         team_id = self.team_combobox.get_id()
@@ -238,16 +279,26 @@ class EditContractView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.contract_id = None
         self.seasons_data = {}
         self.teams_data = {}
         self.drivers_data = {}
-        self._load_relations_data()
         self.create_widgets()
 
-    def _load_relations_data(self):
-        seasons_resp = self.api_client.get_seasons()
+    def _fetch_relations_data_for_display_async(self, contract_id):
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=store.seasons.get_all,
+            teams=store.teams.get_all,
+            drivers=store.drivers.get_all,
+            contract=(self.api_client.get_contract, contract_id),
+        )
+
+        self.after(0, lambda: self._update_relations_maps_and_load_contract(
+            responses["seasons"], responses["teams"], responses["drivers"], contract_id, responses["contract"]))
+
+    def _update_relations_maps_and_load_contract(self, seasons_resp, teams_resp, drivers_resp, contract_id, contract_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
             show_error("Erro", seasons_resp.get("error", "Falha ao carregar temporadas para exibição."))
         elif seasons_resp is not None:
@@ -255,7 +306,6 @@ class EditContractView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para temporadas.")
 
-        teams_resp = self.api_client.get_teams()
         if isinstance(teams_resp, dict) and "error" in teams_resp:
             show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para exibição."))
         elif teams_resp is not None:
@@ -263,7 +313,6 @@ class EditContractView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para equipes.")
 
-        drivers_resp = self.api_client.get_drivers()
         if isinstance(drivers_resp, dict) and "error" in drivers_resp:
             show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para exibição."))
         elif drivers_resp is not None:
@@ -271,6 +320,8 @@ class EditContractView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para pilotos.")
 
+        self.load_contract_data(contract_id, contract_resp)
+
     def create_widgets(self):
         header = AppHeaderFrame(self, title_text="Editar Contrato de Piloto")
         header.pack(fill="x", pady=(0, 10))
@@ -298,9 +349,16 @@ class EditContractView(tk.Frame):
         ttk.Button(button_frame, text="Salvar Alterações", command=self.save_changes, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Cancelar", command=lambda: self.controller.show_frame("ContractListView"), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
-    def load_contract_data(self, contract_id):
+    def on_show(self, contract_id=None, **kwargs):
+        if contract_id:
+            self.contract_id = contract_id
+            threading.Thread(target=self._fetch_relations_data_for_display_async, args=(contract_id,), daemon=True).start()
+        else:
+            show_error("Erro", "ID do contrato não fornecido para edição.")
+            self.controller.show_frame("ContractListView")
+
+    def load_contract_data(self, contract_id, response):
         self.contract_id = contract_id
-        response = self.api_client.get_contract(contract_id)
         if isinstance(response, dict) and "error" in response:
             show_error("Erro", response.get("error", "Falha ao carregar dados do contrato."))
             self.controller.show_frame("ContractListView")
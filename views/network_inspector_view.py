@@ -0,0 +1,185 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+import time
+
+from ui_elements import show_info, show_error, \
+    COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, COLOR_FOREGROUND_DARK, AppHeaderFrame
+
+# Intervalo (ms) de atualização automática enquanto a tela está visível
+AUTO_REFRESH_MS = 2000
+
+def _fmt_ms(value):
+    return "" if value is None else f"{value:.1f}"
+
+class NetworkInspectorView(tk.Frame):
+    """Diagnóstico das últimas chamadas feitas pelo ApiClient e agregados por endpoint."""
+
+    CALL_COLUMNS = ("Hora", "Método", "Endpoint", "Status", "Latência (ms)", "TTFB (ms)", "Bytes", "Cache", "Erro")
+    ENDPOINT_COLUMNS = ("Endpoint", "Chamadas", "Erros", "p50 (ms)", "p95 (ms)", "Máx (ms)")
+
+    def __init__(self, parent, controller):
+        super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
+        self.controller = controller
+        self.api_client = controller.api_client
+        # Ordenação atual de cada tabela: (coluna, decrescente)
+        self._sort = {
+            "calls": ("Latência (ms)", True), # Mais lentas primeiro
+            "endpoints": ("p95 (ms)", True),
+        }
+        self._refresh_job = None
+        # Valores exibidos por item de cada tabela, para atualizar só o que mudou
+        self._rendered = {"calls": {}, "endpoints": {}}
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        header = AppHeaderFrame(self, title_text="Inspetor de Rede")
+        header.pack(fill="x", pady=(0, 10))
+
+        button_frame = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Atualizar", command=self.refresh, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Exportar JSON", command=self.export_json, style="Accent.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Limpar", command=self.clear, style="Delete.TButton").pack(side=tk.LEFT, padx=10)
+
+        self.summary_label = tk.Label(self, text="", font=("Arial", 10), bg=COLOR_BACKGROUND_DARK, fg=COLOR_FOREGROUND_DARK)
+        self.summary_label.pack()
+
+        tk.Label(self, text="Por endpoint", font=("Arial", 12, "bold"),
+                 bg=COLOR_BACKGROUND_DARK, fg=COLOR_FOREGROUND_LIGHT).pack(anchor="w", padx=20, pady=(10, 0))
+        self.endpoint_tree = self._create_tree("endpoints", self.ENDPOINT_COLUMNS, height=6)
+
+        tk.Label(self, text="Chamadas recentes", font=("Arial", 12, "bold"),
+                 bg=COLOR_BACKGROUND_DARK, fg=COLOR_FOREGROUND_LIGHT).pack(anchor="w", padx=20, pady=(10, 0))
+        self.calls_tree = self._create_tree("calls", self.CALL_COLUMNS, height=12)
+
+        ttk.Button(self, text="Voltar à Tela Inicial", command=lambda: self.controller.show_frame("WelcomeView"),
+                   style="Monochromatic.TButton").pack(pady=20)
+
+    def _create_tree(self, name, columns, height):
+        frame = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
+        frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=height)
+        for col in columns:
+            tree.heading(col, text=col, command=lambda c=col: self._sort_by(name, c))
+            wide = col in ("Endpoint", "Erro")
+            tree.column(col, width=220 if wide else 90, anchor=tk.W if wide else tk.CENTER)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill=tk.BOTH, expand=True)
+        scrollbar.pack(side="right", fill="y")
+        return tree
+
+    def on_show(self, **kwargs):
+        self.refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+        self._refresh_job = self.after(AUTO_REFRESH_MS, self._auto_refresh)
+
+    def _auto_refresh(self):
+        self._refresh_job = None
+        # Para sozinho quando o usuário sai da tela
+        if self.winfo_ismapped():
+            self.refresh()
+
+    def _sort_by(self, name, column):
+        current, descending = self._sort[name]
+        # Clicar de novo na mesma coluna inverte a ordem; colunas novas começam pelo maior valor
+        self._sort[name] = (column, not descending if column == current else True)
+        self.refresh()
+
+    def refresh(self):
+        metrics = self.api_client.metrics
+        records = metrics.records()
+        stats = metrics.endpoint_stats()
+
+        call_rows = []
+        for record in records:
+            call_rows.append((record["seq"], (
+                time.strftime("%H:%M:%S", time.localtime(record["timestamp"])),
+                record.get("method"),
+                record.get("endpoint"),
+                record.get("status") or "",
+                record.get("latency_ms"),
+                record.get("ttfb_ms"),
+                record.get("bytes") or 0,
+                record.get("cache") or "",
+                record.get("error") or "",
+            )))
+        endpoint_rows = []
+        for endpoint, data in stats.items():
+            latency = data["latency_ms"]
+            endpoint_rows.append((endpoint, (endpoint, data["count"], data["errors"], latency["p50"], latency["p95"], latency["max"])))
+
+        self._fill_tree(self.calls_tree, "calls", self.CALL_COLUMNS, call_rows, ms_columns=(4, 5))
+        self._fill_tree(self.endpoint_tree, "endpoints", self.ENDPOINT_COLUMNS, endpoint_rows, ms_columns=(3, 4, 5))
+
+        errors = sum(1 for record in records if record.get("error"))
+        total_bytes = sum(record.get("bytes") or 0 for record in records)
+        self.summary_label.config(
+            text=f"{len(records)} chamadas registradas · {errors} com erro · {total_bytes / 1024:.1f} KB recebidos"
+        )
+        self._schedule_refresh()
+
+    def _fill_tree(self, tree, name, columns, rows, ms_columns=()):
+        """Sincroniza a tabela com rows, pares (chave, linha), sem recriar os itens.
+
+        Cada linha vira o item de iid str(chave): a atualização automática só insere as chamadas
+        novas, remove as que saíram do buffer e move as que mudaram de posição, preservando
+        seleção e rolagem.
+        """
+        column, descending = self._sort[name]
+        index = columns.index(column)
+        # Valores ausentes (None/"") ficam sempre no fim, em qualquer ordem
+        present = [(key, row) for key, row in rows if row[index] not in (None, "")]
+        missing = [(key, row) for key, row in rows if row[index] in (None, "")]
+        rows = sorted(present, key=lambda item: item[1][index], reverse=descending) + missing
+
+        for col in columns:
+            arrow = (" ▼" if descending else " ▲") if col == column else ""
+            tree.heading(col, text=col + arrow)
+
+        rendered = self._rendered[name]
+        wanted = {str(key) for key, _ in rows}
+        gone = [iid for iid in rendered if iid not in wanted]
+        if gone:
+            tree.delete(*gone)
+            for iid in gone:
+                del rendered[iid]
+
+        children = list(tree.get_children())
+        for position, (key, row) in enumerate(rows):
+            iid = str(key)
+            values = tuple(_fmt_ms(value) if i in ms_columns else value for i, value in enumerate(row))
+            if iid not in rendered:
+                tree.insert("", position, iid=iid, values=values)
+                children.insert(position, iid)
+            else:
+                if rendered[iid] != values:
+                    tree.item(iid, values=values)
+                if children[position] != iid:
+                    tree.move(iid, "", position)
+                    children.remove(iid)
+                    children.insert(position, iid)
+            rendered[iid] = values
+
+    def export_json(self):
+        path = filedialog.asksaveasfilename(
+            title="Exportar métricas de rede",
+            defaultextension=".json",
+            initialfile=time.strftime("api-metrics-%Y%m%d-%H%M%S.json"),
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            self.api_client.metrics.export_json(path)
+            show_info("Sucesso", f"Métricas exportadas para {path}")
+        except OSError as e:
+            show_error("Erro", f"Falha ao exportar métricas: {e}")
+
+    def clear(self):
+        self.api_client.metrics.clear()
+        self.refresh()
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 
-from api_client import ApiClient
 from ui_elements import LabeledCombobox, show_error, \
     COLOR_PRIMARY_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_MEDIUM, COLOR_BACKGROUND_LIGHT, AppHeaderFrame
@@ -11,7 +10,7 @@ class OverallStandingsView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.seasons_data = {} # {id: year}
         self.selected_season_id = None
         self.driver_standings_data = []
@@ -43,7 +42,8 @@ class OverallStandingsView(tk.Frame):
 
     def _fetch_seasons_async(self):
         """Busca as temporadas da API em uma thread separada."""
-        seasons_resp = self.api_client.get_seasons()
+        with self.api_client.deadline():
+            seasons_resp = self.controller.entity_store.seasons.get_all()
         self.after(0, lambda: self._handle_seasons_response(seasons_resp))
 
     def _handle_seasons_response(self, seasons_resp):
@@ -181,10 +181,13 @@ class OverallStandingsView(tk.Frame):
                          args=(self.selected_season_id,), daemon=True).start()
 
     def _fetch_standings_async(self, season_id):
-        driver_standings_resp = self.api_client.get_driver_standings(season_id)
-        team_standings_resp = self.api_client.get_team_standings(season_id)
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            drivers=(store.get_standings, "drivers", season_id),
+            teams=(store.get_standings, "teams", season_id),
+        )
         
-        self.after(0, lambda: self._handle_standings_response(driver_standings_resp, team_standings_resp))
+        self.after(0, lambda: self._handle_standings_response(responses["drivers"], responses["teams"]))
 
     def _handle_standings_response(self, driver_standings_resp, team_standings_resp):
         self.standings_loading_label.pack_forget()
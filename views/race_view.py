@@ -2,20 +2,21 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 
-from api_client import ApiClient
 from ui_elements import LabeledEntry, LabeledCombobox, LabeledSpinbox, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_DANGER_ACCENT, COLOR_BACKGROUND_LIGHT, \
-    format_date_display, format_date_api, AppHeaderFrame
+    format_date_display, format_date_api, AppHeaderFrame, RefreshIndicator, report_load_error
+from virtual_tree import VirtualTreeview
 
 class RaceListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.races = []
         self.seasons_map = {}
         self.circuits_map = {}
+        self._rendered = None # (corridas, temporadas, circuitos) exibidos no treeview
         
         self.create_widgets()
 
@@ -26,7 +27,7 @@ class RaceListView(tk.Frame):
         button_frame = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
         button_frame.pack(pady=10)
         ttk.Button(button_frame, text="Adicionar Nova Corrida", command=self.add_race, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Atualizar Lista", command=self.load_races, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Lista", command=lambda: self.load_races(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
         self.content_container = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
         self.content_container.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
@@ -34,13 +35,14 @@ class RaceListView(tk.Frame):
         self.loading_label = ttk.Label(self.content_container, text="Carregando corridas...", 
                                         background=COLOR_BACKGROUND_DARK, foreground=COLOR_FOREGROUND_LIGHT,
                                         font=("Arial", 12, "bold"))
+        self.refresh_indicator = RefreshIndicator(self.content_container)
         
         style = ttk.Style()
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"), background=COLOR_BACKGROUND_LIGHT, foreground=COLOR_FOREGROUND_LIGHT)
         style.configure("Treeview", font=("Arial", 10), rowheight=28, background=COLOR_BACKGROUND_MEDIUM, foreground=COLOR_FOREGROUND_LIGHT, fieldbackground=COLOR_BACKGROUND_MEDIUM)
         style.map('Treeview', background=[('selected', COLOR_PRIMARY_ACCENT)], foreground=[('selected', 'white')])
 
-        self.tree = ttk.Treeview(self.content_container, columns=("ID", "Nome", "Data", "Temporada", "Circuito", "Voltas", "Clima"), show="headings")
+        self.tree = VirtualTreeview(self.content_container, columns=("ID", "Nome", "Data", "Temporada", "Circuito", "Voltas", "Clima"))
         self.tree.heading("ID", text="ID")
         self.tree.heading("Nome", text="Nome")
         self.tree.heading("Data", text="Data")
@@ -68,61 +70,80 @@ class RaceListView(tk.Frame):
                    style="Monochromatic.TButton").pack(pady=20)
 
     def on_show(self, **kwargs):
+        self.tree.resume_fill()
         self.load_races()
 
-    def load_races(self):
-        self.tree.pack_forget()
-        self.loading_label.pack(pady=10)
-        
-        self.relations_loaded_event = threading.Event()
+    def on_hide(self):
+        """Interrompe o preenchimento da tabela ao sair da tela; on_show o retoma."""
+        self.tree.cancel_fill()
+
+    def load_races(self, force=False):
+        store = self.controller.entity_store
+        repos = {name: store.repository(name) for name in ("races", "seasons", "circuits")}
+        cached = {name: repo.peek() for name, repo in repos.items()} if self.controller.stale_while_revalidate else {}
+        # Só exibe o cache se todas as coleções forem conhecidas; sem uma delas a tabela sairia com ids no lugar dos nomes
+        if cached and all(cached.values()):
+            # Exibe as últimas corridas conhecidas; a API só é consultada se algo estiver vencido
+            self._handle_all_data(cached)
+            if not force and not any(repo.is_stale() for repo in repos.values()):
+                return
+            self.refresh_indicator.start()
+        else:
+            self.tree.pack_forget()
+            self.loading_label.pack(pady=10)
         
-        threading.Thread(target=self._fetch_all_data_async, daemon=True).start()
+        threading.Thread(target=self._fetch_all_data_async, args=(force,), daemon=True).start()
 
-    def _fetch_all_data_async(self):
-        seasons_resp = self.api_client.get_seasons()
-        circuits_resp = self.api_client.get_circuits()
+    def _fetch_all_data_async(self, force):
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=(store.seasons.get_all, force),
+            circuits=(store.circuits.get_all, force),
+            races=(store.races.get_all, force),
+        )
 
-        self.after(0, lambda: self._update_relations_maps_and_signal(seasons_resp, circuits_resp))
-        
-        self.relations_loaded_event.wait() 
+        self.after(0, lambda: self._handle_all_data(responses))
 
-        races_resp = self.api_client.get_races()
-        
-        self.after(0, lambda: self._handle_races_response(races_resp))
+    def _handle_all_data(self, responses):
+        self.loading_label.pack_forget()
+        self.refresh_indicator.stop()
+        self._update_relations_maps(responses["seasons"], responses["circuits"])
+        self._handle_races_response(responses["races"])
 
-    def _update_relations_maps_and_signal(self, seasons_resp, circuits_resp):
+    def _report_error(self, message):
+        report_load_error(message, self.refresh_indicator, self.tree)
+
+    def _update_relations_maps(self, seasons_resp, circuits_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
-            show_error("Erro", seasons_resp.get("error", "Falha ao carregar temporadas para exibição."))
+            self._report_error(seasons_resp.get("error", "Falha ao carregar temporadas para exibição."))
         elif seasons_resp is not None:
             self.seasons_map = {s["id"]: s["year"] for s in seasons_resp}
         else:
-            show_error("Erro", "Resposta inesperada para temporadas.")
+            self._report_error("Resposta inesperada para temporadas.")
 
         if isinstance(circuits_resp, dict) and "error" in circuits_resp:
-            show_error("Erro", circuits_resp.get("error", "Falha ao carregar circuitos para exibição."))
+            self._report_error(circuits_resp.get("error", "Falha ao carregar circuitos para exibição."))
         elif circuits_resp is not None:
             self.circuits_map = {c["id"]: c["name"] for c in circuits_resp}
         else:
-            show_error("Erro", "Resposta inesperada para circuitos.")
-        
-        self.relations_loaded_event.set()
+            self._report_error("Resposta inesperada para circuitos.")
 
     def _handle_races_response(self, response):
-        self.loading_label.pack_forget()
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
+        rendered = (response, self.seasons_map, self.circuits_map)
         if isinstance(response, dict) and "error" in response:
-            show_error("Erro", response.get("error", "Falha ao carregar corridas."))
+            self._report_error(response.get("error", "Falha ao carregar corridas."))
+        elif rendered == self._rendered and self.tree.winfo_manager():
+            pass # Revalidação sem mudanças: nada a redesenhar
         elif response is not None:
             self.races = response
+            self._rendered = (response, dict(self.seasons_map), dict(self.circuits_map))
+            rows = []
             for race in self.races:
                 season_year = self.seasons_map.get(race.get("season_id"), "N/A")
                 circuit_name = self.circuits_map.get(race.get("circuit_id"), "N/A")
                 
                 race_date_display = format_date_display(race.get("race_date", ""))
-                self.tree.insert("", tk.END, values=(
+                rows.append((
                     race.get("id"),
                     race.get("name"),
                     race_date_display,
@@ -131,9 +152,10 @@ class RaceListView(tk.Frame):
                     race.get("laps"),
                     race.get("weather")
                 ))
+            self.tree.set_rows(rows)
             self.tree.pack(fill=tk.BOTH, expand=True)
         else:
-            show_error("Erro", "Resposta inesperada da API.")
+            self._report_error("Resposta inesperada da API.")
 
     def add_race(self):
         self.controller.show_frame("AddRaceView")
@@ -169,16 +191,19 @@ class AddRaceView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.seasons_data = {}
         self.circuits_data = {}
         self.create_widgets()
 
     def _fetch_and_populate_relations_async(self):
-        seasons_resp = self.api_client.get_seasons()
-        circuits_resp = self.api_client.get_circuits()
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=store.seasons.get_all,
+            circuits=store.circuits.get_all,
+        )
 
-        self.after(0, lambda: self._populate_comboboxes(seasons_resp, circuits_resp))
+        self.after(0, lambda: self._populate_comboboxes(responses["seasons"], responses["circuits"]))
 
     def _populate_comboboxes(self, seasons_resp, circuits_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
@@ -287,7 +312,7 @@ class EditRaceView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.race_id = None
         self._original_season_id = None
         self._original_circuit_id = None
@@ -296,12 +321,17 @@ class EditRaceView(tk.Frame):
         self.create_widgets()
 
     def _fetch_relations_data_for_display_async(self, race_id):
-        seasons_resp = self.api_client.get_seasons()
-        circuits_resp = self.api_client.get_circuits()
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            seasons=store.seasons.get_all,
+            circuits=store.circuits.get_all,
+            race=(self.api_client.get_race, race_id),
+        )
 
-        self.after(0, lambda: self._update_relations_maps_and_load_race(seasons_resp, circuits_resp, race_id))
+        self.after(0, lambda: self._update_relations_maps_and_load_race(
+            responses["seasons"], responses["circuits"], race_id, responses["race"]))
 
-    def _update_relations_maps_and_load_race(self, seasons_resp, circuits_resp, race_id):
+    def _update_relations_maps_and_load_race(self, seasons_resp, circuits_resp, race_id, race_resp):
         if isinstance(seasons_resp, dict) and "error" in seasons_resp:
             show_error("Erro", seasons_resp.get("error", "Falha ao carregar temporadas para exibição."))
         elif seasons_resp is not None:
@@ -318,7 +348,7 @@ class EditRaceView(tk.Frame):
         else:
             show_error("Erro", "Resposta inesperada para circuitos.")
         
-        self._load_race_data_sync(race_id)
+        self._load_race_data(race_id, race_resp)
 
     def create_widgets(self):
         header = AppHeaderFrame(self, title_text="Editar Corrida")
@@ -357,9 +387,8 @@ class EditRaceView(tk.Frame):
             show_error("Erro", "ID da corrida não fornecido para edição.")
             self.controller.show_frame("RaceListView")
 
-    def _load_race_data_sync(self, race_id):
+    def _load_race_data(self, race_id, response):
         self.race_id = race_id
-        response = self.api_client.get_race(race_id)
         if isinstance(response, dict) and "error" in response:
             show_error("Erro", response.get("error", "Falha ao carregar dados da corrida."))
             self.controller.show_frame("RaceListView")
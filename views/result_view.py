@@ -2,20 +2,21 @@ import tkinter as tk
 from tkinter import ttk
 import threading 
 
-from api_client import ApiClient
 from ui_elements import LabeledEntry, LabeledCombobox, LabeledSpinbox, LabeledCheckbutton, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
-    COLOR_BACKGROUND_MEDIUM, COLOR_BACKGROUND_LIGHT, AppHeaderFrame
+    COLOR_BACKGROUND_MEDIUM, COLOR_BACKGROUND_LIGHT, AppHeaderFrame, RefreshIndicator, report_load_error
+from virtual_tree import VirtualTreeview
 
 class ResultListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.results = []
         self.races_map = {}
         self.teams_map = {}
         self.drivers_map = {}
+        self._rendered = None # (resultados, corridas, equipes, pilotos) exibidos no treeview
 
         self.create_widgets()
 
@@ -26,7 +27,7 @@ class ResultListView(tk.Frame):
         button_frame = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
         button_frame.pack(pady=10)
         ttk.Button(button_frame, text="Adicionar Novo Resultado", command=self.add_result, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Atualizar Lista", command=self.load_results, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Lista", command=lambda: self.load_results(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
         self.content_container = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
         self.content_container.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
@@ -34,13 +35,14 @@ class ResultListView(tk.Frame):
         self.loading_label = ttk.Label(self.content_container, text="Carregando resultados...", 
                                        background=COLOR_BACKGROUND_DARK, foreground=COLOR_FOREGROUND_LIGHT,
                                        font=("Arial", 12, "bold"))
+        self.refresh_indicator = RefreshIndicator(self.content_container)
         
         style = ttk.Style()
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"), background=COLOR_BACKGROUND_LIGHT, foreground=COLOR_FOREGROUND_LIGHT)
         style.configure("Treeview", font=("Arial", 10), rowheight=28, background=COLOR_BACKGROUND_MEDIUM, foreground=COLOR_FOREGROUND_LIGHT, fieldbackground=COLOR_BACKGROUND_MEDIUM)
         style.map('Treeview', background=[('selected', COLOR_PRIMARY_ACCENT)], foreground=[('selected', 'white')])
 
-        self.tree = ttk.Treeview(self.content_container, columns=("ID", "Corrida", "Equipe", "Piloto", "Posição", "Pontos", "Volta Mais Rápida"), show="headings")
+        self.tree = VirtualTreeview(self.content_container, columns=("ID", "Corrida", "Equipe", "Piloto", "Posição", "Pontos", "Volta Mais Rápida"))
         self.tree.heading("ID", text="ID")
         self.tree.heading("Corrida", text="Corrida")
         self.tree.heading("Equipe", text="Equipe")
@@ -69,75 +71,91 @@ class ResultListView(tk.Frame):
 
     def on_show(self, **kwargs):
         """Carrega os dados de relações e resultados quando a ResultListView é exibida."""
+        self.tree.resume_fill()
         self.load_results()
 
-    def load_results(self):
-        self.tree.pack_forget()
-        self.loading_label.pack(pady=10)
+    def on_hide(self):
+        """Interrompe o preenchimento da tabela ao sair da tela; on_show o retoma."""
+        self.tree.cancel_fill()
+
+    def load_results(self, force=False):
+        store = self.controller.entity_store
+        repos = {name: store.repository(name) for name in ("results", "races", "teams", "drivers")}
+        cached = {name: repo.peek() for name, repo in repos.items()} if self.controller.stale_while_revalidate else {}
+        # Só exibe o cache se todas as coleções forem conhecidas; sem uma delas a tabela sairia com ids no lugar dos nomes
+        if cached and all(cached.values()):
+            # Exibe os últimos resultados conhecidos; a API só é consultada se algo estiver vencido
+            self._handle_all_data(cached)
+            if not force and not any(repo.is_stale() for repo in repos.values()):
+                return
+            self.refresh_indicator.start()
+        else:
+            self.tree.pack_forget()
+            self.loading_label.pack(pady=10)
         
-        self.relations_loaded_event = threading.Event()
+        threading.Thread(target=self._fetch_all_data_async, args=(force,), daemon=True).start()
+
+    def _fetch_all_data_async(self, force):
+        """Busca as dependências (corridas, equipes, pilotos) e os resultados em paralelo."""
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            races=(store.races.get_all, force),
+            teams=(store.teams.get_all, force),
+            drivers=(store.drivers.get_all, force),
+            results=(store.results.get_all, force),
+        )
         
-        threading.Thread(target=self._fetch_all_data_async, daemon=True).start()
+        self.after(0, lambda: self._handle_all_data(responses))
 
-    def _fetch_all_data_async(self):
-        """Busca todas as dependências (corridas, equipes, pilotos) e resultados em threads separadas."""
-        races_resp = self.api_client.get_races()
-        teams_resp = self.api_client.get_teams()
-        drivers_resp = self.api_client.get_drivers()
+    def _handle_all_data(self, responses):
+        """Atualiza os mapas de relações e, em seguida, a lista de resultados."""
+        self.loading_label.pack_forget()
+        self.refresh_indicator.stop()
+        self._update_relations_maps(responses["races"], responses["teams"], responses["drivers"])
+        self._handle_results_response(responses["results"])
 
-        
-        self.after(0, lambda: self._update_relations_maps_and_signal(races_resp, teams_resp, drivers_resp))
-        
-        
-        self.relations_loaded_event.wait() 
+    def _report_error(self, message):
+        report_load_error(message, self.refresh_indicator, self.tree)
 
-        
-        results_resp = self.api_client.get_results()
-        
-        self.after(0, lambda: self._handle_results_response(results_resp))
-
-    def _update_relations_maps_and_signal(self, races_resp, teams_resp, drivers_resp):
-        """Atualiza os mapas de relações e sinaliza que terminaram."""
+    def _update_relations_maps(self, races_resp, teams_resp, drivers_resp):
+        """Atualiza os mapas de relações usados na exibição dos resultados."""
         if isinstance(races_resp, dict) and "error" in races_resp:
-            show_error("Erro", races_resp.get("error", "Falha ao carregar corridas para exibição."))
+            self._report_error(races_resp.get("error", "Falha ao carregar corridas para exibição."))
         elif races_resp is not None:
             self.races_map = {r["id"]: r["name"] for r in races_resp}
         else:
-            show_error("Erro", "Resposta inesperada para corridas.")
+            self._report_error("Resposta inesperada para corridas.")
 
         if isinstance(teams_resp, dict) and "error" in teams_resp:
-            show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para exibição."))
+            self._report_error(teams_resp.get("error", "Falha ao carregar equipes para exibição."))
         elif teams_resp is not None:
             self.teams_map = {t["id"]: t["name"] for t in teams_resp}
         else:
-            show_error("Erro", "Resposta inesperada para equipes.")
+            self._report_error("Resposta inesperada para equipes.")
 
         if isinstance(drivers_resp, dict) and "error" in drivers_resp:
-            show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para exibição."))
+            self._report_error(drivers_resp.get("error", "Falha ao carregar pilotos para exibição."))
         elif drivers_resp is not None:
             self.drivers_map = {d["id"]: d["full_name"] for d in drivers_resp}
         else:
-            show_error("Erro", "Resposta inesperada para pilotos.")
-        
-        self.relations_loaded_event.set()
+            self._report_error("Resposta inesperada para pilotos.")
+
     def _handle_results_response(self, response):
         """Método para processar a resposta da API de resultados e atualizar a UI na thread principal."""
-        
-        self.loading_label.pack_forget()
-
-        
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
+        rendered = (response, self.races_map, self.teams_map, self.drivers_map)
         if isinstance(response, dict) and "error" in response:
-            show_error("Erro", response.get("error", "Falha ao carregar resultados."))
+            self._report_error(response.get("error", "Falha ao carregar resultados."))
+        elif rendered == self._rendered and self.tree.winfo_manager():
+            pass # Revalidação sem mudanças: nada a redesenhar
         elif response is not None:
             self.results = response
+            self._rendered = (response, dict(self.races_map), dict(self.teams_map), dict(self.drivers_map))
+            rows = []
             for result in self.results:
                 race_name = self.races_map.get(result.get("race_id"), "N/A")
                 team_name = self.teams_map.get(result.get("team_id"), "N/A")
                 driver_name = self.drivers_map.get(result.get("driver_id"), "N/A")
-                self.tree.insert("", tk.END, values=(
+                rows.append((
                     result.get("id"),
                     race_name,
                     team_name,
@@ -146,10 +164,11 @@ class ResultListView(tk.Frame):
                     result.get("points"),
                     result.get("fastest_lap")
                 ))
+            self.tree.set_rows(rows)
             
             self.tree.pack(fill=tk.BOTH, expand=True)
         else:
-            show_error("Erro", "Resposta inesperada da API.")
+            self._report_error("Resposta inesperada da API.")
 
     def add_result(self):
         self.controller.show_frame("AddResultView")
@@ -185,19 +204,22 @@ class AddResultView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.races_data = {}
         self.teams_data = {}
         self.drivers_data = {}
         self.create_widgets()
 
     def _fetch_and_populate_relations_async(self):
-        """Busca e popula os dados das comboboxes em uma thread separada."""
-        races_resp = self.api_client.get_races()
-        teams_resp = self.api_client.get_teams()
-        drivers_resp = self.api_client.get_drivers()
+        """Busca em paralelo e popula os dados das comboboxes em uma thread separada."""
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            races=store.races.get_all,
+            teams=store.teams.get_all,
+            drivers=store.drivers.get_all,
+        )
 
-        self.after(0, lambda: self._populate_comboboxes(races_resp, teams_resp, drivers_resp))
+        self.after(0, lambda: self._populate_comboboxes(responses["races"], responses["teams"], responses["drivers"]))
 
     def _populate_comboboxes(self, races_resp, teams_resp, drivers_resp):
         """Popula as comboboxes na thread principal."""
@@ -205,7 +227,7 @@ class AddResultView(tk.Frame):
             show_error("Erro", races_resp.get("error", "Falha ao carregar corridas para seleção."))
         elif races_resp is not None:
             self.races_data = {r["id"]: r["name"] for r in races_resp}
-            self.race_combobox.set_options(self.races_data)
+            self.race_combobox.update_options(self.races_data)
         else:
             show_error("Erro", "Resposta inesperada para corridas.")
 
@@ -213,7 +235,7 @@ class AddResultView(tk.Frame):
             show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para seleção."))
         elif teams_resp is not None:
             self.teams_data = {t["id"]: t["name"] for t in teams_resp}
-            self.team_combobox.set_options(self.teams_data)
+            self.team_combobox.update_options(self.teams_data)
         else:
             show_error("Erro", "Resposta inesperada para equipes.")
 
@@ -221,7 +243,7 @@ class AddResultView(tk.Frame):
             show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para seleção."))
         elif drivers_resp is not None:
             self.drivers_data = {d["id"]: d["full_name"] for d in drivers_resp}
-            self.driver_combobox.set_options(self.drivers_data)
+            self.driver_combobox.update_options(self.drivers_data)
         else:
             show_error("Erro", "Resposta inesperada para pilotos.")
 
@@ -254,9 +276,9 @@ class AddResultView(tk.Frame):
 
     def on_show(self, **kwargs):
         """Carrega dados para as comboboxes e limpa os campos ao exibir."""
-        self.race_combobox.set("")
-        self.team_combobox.set("")
-        self.driver_combobox.set("")
+        self.race_combobox.set_by_name("")
+        self.team_combobox.set_by_name("")
+        self.driver_combobox.set_by_name("")
         self.position_spinbox.set(1)
         self.points_spinbox.set(0)  
         self.fastest_lap_check.set(False)
@@ -299,7 +321,7 @@ class EditResultView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.result_id = None
         self._original_race_id = None 
         self.races_data = {}
@@ -307,15 +329,28 @@ class EditResultView(tk.Frame):
         self.drivers_data = {}
         self.create_widgets()
 
-    def _fetch_relations_data_for_display_async(self, result_id):
-        """Busca dados de corridas, equipes e pilotos em uma thread separada para display."""
-        races_resp = self.api_client.get_races()
-        teams_resp = self.api_client.get_teams()
-        drivers_resp = self.api_client.get_drivers()
-
-        self.after(0, lambda: self._update_relations_maps_and_load_result(races_resp, teams_resp, drivers_resp, result_id))
+    def on_show(self, result_id=None, **kwargs):
+        if result_id:
+            self.result_id = result_id
+            threading.Thread(target=self._fetch_relations_data_for_display_async, args=(result_id,), daemon=True).start()
+        else:
+            show_error("Erro", "ID do resultado não fornecido para edição.")
+            self.controller.show_frame("ResultListView")
 
-    def _update_relations_maps_and_load_result(self, races_resp, teams_resp, drivers_resp, result_id):
+    def _fetch_relations_data_for_display_async(self, result_id):
+        """Busca em paralelo corridas, equipes, pilotos e o próprio resultado em uma thread separada."""
+        store = self.controller.entity_store
+        responses = self.api_client.fetch_many(
+            races=store.races.get_all,
+            teams=store.teams.get_all,
+            drivers=store.drivers.get_all,
+            result=(self.api_client.get_result, result_id),
+        )
+
+        self.after(0, lambda: self._update_relations_maps_and_load_result(
+            responses["races"], responses["teams"], responses["drivers"], result_id, responses["result"]))
+
+    def _update_relations_maps_and_load_result(self, races_resp, teams_resp, drivers_resp, result_id, result_resp):
         """Atualiza os mapas de relações e então carrega os dados do resultado na thread principal."""
         if isinstance(races_resp, dict) and "error" in races_resp:
             show_error("Erro", races_resp.get("error", "Falha ao carregar corridas para exibição."))
@@ -328,7 +363,7 @@ class EditResultView(tk.Frame):
             show_error("Erro", teams_resp.get("error", "Falha ao carregar equipes para exibição."))
         elif teams_resp is not None:
             self.teams_data = {t["id"]: t["name"] for t in teams_resp}
-            self.team_combobox.set_options(self.teams_data)
+            self.team_combobox.update_options(self.teams_data)
         else:
             show_error("Erro", "Resposta inesperada para equipes.")
 
@@ -336,11 +371,11 @@ class EditResultView(tk.Frame):
             show_error("Erro", drivers_resp.get("error", "Falha ao carregar pilotos para exibição."))
         elif drivers_resp is not None:
             self.drivers_data = {d["id"]: d["full_name"] for d in drivers_resp}
-            self.driver_combobox.set_options(self.drivers_data)
+            self.driver_combobox.update_options(self.drivers_data)
         else:
             show_error("Erro", "Resposta inesperada para pilotos.")
 
-        self._load_result_data_sync(result_id)
+        self._load_result_data(result_id, result_resp)
 
     def create_widgets(self):
         header = AppHeaderFrame(self, title_text="Editar Resultado de Corrida")
@@ -372,9 +407,8 @@ class EditResultView(tk.Frame):
         ttk.Button(button_frame, text="Salvar Alterações", command=self.save_changes, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Cancelar", command=lambda: self.controller.show_frame("ResultListView"), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
-    def _load_result_data_sync(self, result_id):
+    def _load_result_data(self, result_id, response):
         self.result_id = result_id
-        response = self.api_client.get_result(result_id)
         if isinstance(response, dict) and "error" in response:
             show_error("Erro", response.get("error", "Falha ao carregar dados do resultado."))
             self.controller.show_frame("ResultListView")
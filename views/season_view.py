@@ -2,18 +2,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading # Importar o módulo threading
 
-from api_client import ApiClient
 from ui_elements import LabeledEntry, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_BACKGROUND_LIGHT, \
-    format_date_display, format_date_api, AppHeaderFrame
+    format_date_display, format_date_api, AppHeaderFrame, RefreshIndicator, report_load_error
+from virtual_tree import VirtualTreeview
 
 
 class SeasonListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.seasons = []
 
         self.create_widgets()
@@ -29,7 +29,7 @@ class SeasonListView(tk.Frame):
         
         ttk.Button(button_frame, text="Adicionar Nova Temporada", command=self.add_season, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         # O botão "Atualizar Lista" agora chamará o método que inicia o carregamento assíncrono
-        ttk.Button(button_frame, text="Atualizar Lista", command=self.load_seasons, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Lista", command=lambda: self.load_seasons(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
         
         # Container para o indicador de carregamento e o Treeview
         self.content_container = tk.Frame(self, bg=COLOR_BACKGROUND_DARK)
@@ -39,13 +39,14 @@ class SeasonListView(tk.Frame):
         self.loading_label = ttk.Label(self.content_container, text="Carregando temporadas...", 
                                        background=COLOR_BACKGROUND_DARK, foreground=COLOR_FOREGROUND_LIGHT,
                                        font=("Arial", 12, "bold"))
+        self.refresh_indicator = RefreshIndicator(self.content_container)
         
         style = ttk.Style()
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"), background=COLOR_BACKGROUND_LIGHT, foreground=COLOR_FOREGROUND_LIGHT)
         style.configure("Treeview", font=("Arial", 10), rowheight=28, background=COLOR_BACKGROUND_MEDIUM, foreground=COLOR_FOREGROUND_LIGHT, fieldbackground=COLOR_BACKGROUND_MEDIUM)
         style.map('Treeview', background=[('selected', COLOR_PRIMARY_ACCENT)], foreground=[('selected', 'white')])
 
-        self.tree = ttk.Treeview(self.content_container, columns=("ID", "Ano", "Data Início", "Descrição"), show="headings")
+        self.tree = VirtualTreeview(self.content_container, columns=("ID", "Ano", "Data Início", "Descrição"))
         self.tree.heading("ID", text="ID")
         self.tree.heading("Ano", text="Ano")
         self.tree.heading("Data Início", text="Data Início")
@@ -70,20 +71,35 @@ class SeasonListView(tk.Frame):
     # NOVO: Método chamado pelo Controller quando esta tela é exibida
     def on_show(self, **kwargs):
         """Carrega os dados das temporadas quando a SeasonListView é exibida."""
+        self.tree.resume_fill()
         self.load_seasons()
 
+    def on_hide(self):
+        """Interrompe o preenchimento da tabela ao sair da tela; on_show o retoma."""
+        self.tree.cancel_fill()
+
     # ATUALIZADO: Este método agora inicia o carregamento em uma thread separada
-    def load_seasons(self):
-        # 1. Esconde o treeview e mostra o indicador de carregamento
-        self.tree.pack_forget()
-        self.loading_label.pack(pady=10)
+    def load_seasons(self, force=False):
+        repo = self.controller.entity_store.seasons
+        cached = repo.peek() if self.controller.stale_while_revalidate else None
+        if cached:
+            # Exibe a última lista conhecida; a API só é consultada se ela estiver vencida
+            self._handle_seasons_response(cached)
+            if not force and not repo.is_stale():
+                return
+            self.refresh_indicator.start()
+        else:
+            # 1. Esconde o treeview e mostra o indicador de carregamento
+            self.tree.pack_forget()
+            self.loading_label.pack(pady=10)
         
         # 2. Inicia a operação da API em uma nova thread
-        threading.Thread(target=self._fetch_seasons_async, daemon=True).start()
+        threading.Thread(target=self._fetch_seasons_async, args=(force,), daemon=True).start()
 
-    def _fetch_seasons_async(self):
+    def _fetch_seasons_async(self, force):
         """Método para buscar as temporadas da API em uma thread separada."""
-        response = self.api_client.get_seasons()
+        with self.api_client.deadline():
+            response = self.controller.entity_store.seasons.get_all(force=force)
         # 3. Usa self.after para agendar a atualização da UI na thread principal do Tkinter
         self.after(0, lambda: self._handle_seasons_response(response))
 
@@ -91,23 +107,26 @@ class SeasonListView(tk.Frame):
         """Método para processar a resposta da API e atualizar a UI na thread principal."""
         # 4. Esconde o indicador de carregamento
         self.loading_label.pack_forget()
-
-        # 5. Limpa o treeview antes de popular com novos dados
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.refresh_indicator.stop()
 
         if isinstance(response, dict) and "error" in response:
-            show_error("Erro", response.get("error", "Falha ao carregar temporadas."))
+            # Mantém as linhas já exibidas, se houver, e só avisa no indicador
+            report_load_error(response.get("error", "Falha ao carregar temporadas."), self.refresh_indicator, self.tree)
+        elif response == self.seasons and self.tree.winfo_manager():
+            pass # Revalidação sem mudanças: nada a redesenhar
         elif response is not None:
+            # 5. Substitui as linhas do treeview pelos novos dados
             self.seasons = response
+            rows = []
             for season in self.seasons:
                 start_date_display = format_date_display(season.get("start_date", ""))
-                self.tree.insert("", tk.END, values=(
+                rows.append((
                     season.get("id"),
                     season.get("year"),
                     start_date_display,
                     season.get("description")
                 ))
+            self.tree.set_rows(rows)
             # 6. Empacota o treeview de volta após carregar os dados
             self.tree.pack(fill=tk.BOTH, expand=True)
         else:
@@ -148,7 +167,7 @@ class AddSeasonView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.create_widgets()
 
     def create_widgets(self):
@@ -220,7 +239,7 @@ class EditSeasonView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.season_id = None
         self.create_widgets()
 
@@ -310,7 +329,7 @@ class DriverStandingsView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.season_id = None
         self.create_widgets()
         # REMOVIDO: Carregamento do __init__
@@ -378,7 +397,8 @@ class DriverStandingsView(tk.Frame):
 
     def _fetch_driver_standings_async(self, season_id):
         """Busca a classificação de pilotos da API em uma thread separada."""
-        response = self.api_client.get_driver_standings(season_id)
+        with self.api_client.deadline():
+            response = self.controller.entity_store.get_standings("drivers", season_id)
         # 3. Usa self.after para agendar a atualização da UI na thread principal do Tkinter
         self.after(0, lambda: self._handle_driver_standings_response(response))
 
@@ -413,7 +433,7 @@ class TeamStandingsView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.season_id = None
         self.create_widgets()
         # REMOVIDO: Carregamento do __init__
@@ -481,7 +501,8 @@ class TeamStandingsView(tk.Frame):
 
     def _fetch_team_standings_async(self, season_id):
         """Busca a classificação de equipes da API em uma thread separada."""
-        response = self.api_client.get_team_standings(season_id)
+        with self.api_client.deadline():
+            response = self.controller.entity_store.get_standings("teams", season_id)
         # 3. Usa self.after para agendar a atualização da UI na thread principal do Tkinter
         self.after(0, lambda: self._handle_team_standings_response(response))
 
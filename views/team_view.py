@@ -2,37 +2,40 @@ import tkinter as tk
 from tkinter import ttk, messagebox, Canvas
 import threading # Importar o módulo threading
 
-from api_client import ApiClient
 from ui_elements import LabeledEntry, ImagePreview, show_info, show_error, show_warning, ask_yes_no, \
     COLOR_PRIMARY_ACCENT, COLOR_SUCCESS_ACCENT, COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_LIGHT, \
     COLOR_BUTTON_TEXT, COLOR_BACKGROUND_MEDIUM, COLOR_FOREGROUND_DARK, COLOR_DANGER_ACCENT, \
-    AppHeaderFrame, BaseEntityCard
+    AppHeaderFrame, BaseEntityCard, EntityCardSpec, RefreshIndicator, report_load_error
+from card_grid import AdaptiveCardGrid
+
+def team_card_spec(controller):
+    """Textos, imagem e ações dos cards de equipes, usados pelo TeamCard e pela grade em canvas."""
+    detail_lines = [
+        ("País Base: ", "base_country", None),
+        ("Diretor: ", "principal", None),
+        ("Ano Fundação: ", "founded_year", None)
+    ]
+    return EntityCardSpec(controller,
+                          item_id_key="id",
+                          image_url_key="logo_url",
+                          title_key="name",
+                          detail_lines_info=detail_lines,
+                          edit_view_name="EditTeamView",
+                          delete_api_call=controller.api_client.delete_team,
+                          # ATUALIZADO: Chama on_show para garantir o recarregamento correto da lista após exclusão
+                          refresh_list_view_callback=lambda: controller.show_frame("TeamListView"))
 
 class TeamCard(BaseEntityCard):
-    def __init__(self, parent, team_data, controller):
-        detail_lines = [
-            ("País Base: ", "base_country", None),
-            ("Diretor: ", "principal", None),
-            ("Ano Fundação: ", "founded_year", None)
-        ]
-        
+    def __init__(self, parent, team_data, controller, lazy_image=False):
         super().__init__(parent, item_data=team_data, controller=controller,
-                         item_id_key="id",
-                         image_url_key="logo_url",
-                         title_key="name",
-                         detail_lines_info=detail_lines,
-                         edit_view_name="EditTeamView",
-                         delete_api_call=lambda id: ApiClient().delete_team(id),
-                         # ATUALIZADO: Chama on_show para garantir o recarregamento correto da lista após exclusão
-                         refresh_list_view_callback=lambda: controller.show_frame("TeamListView") 
-                        )
+                         spec=team_card_spec(controller), lazy_image=lazy_image)
 
 
 class TeamListView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.teams = []
 
         self.create_widgets()
@@ -48,7 +51,7 @@ class TeamListView(tk.Frame):
         
         ttk.Button(button_frame, text="Adicionar Nova Equipe", command=self.add_team, style="Primary.TButton").pack(side=tk.LEFT, padx=10)
         # O botão "Atualizar Cards" agora chamará o método que inicia o carregamento assíncrono
-        ttk.Button(button_frame, text="Atualizar Cards", command=self.load_teams, style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Atualizar Cards", command=lambda: self.load_teams(force=True), style="Monochromatic.TButton").pack(side=tk.LEFT, padx=10)
 
         ttk.Button(self, text="Voltar à Tela Inicial", command=lambda: self.controller.show_frame("WelcomeView"), 
                    style="Monochromatic.TButton").pack(pady=20)
@@ -63,47 +66,44 @@ class TeamListView(tk.Frame):
                                        font=("Arial", 12, "bold"))
         # Ele será empacotado/desempacotado dinamicamente
 
-        # Estrutura do Canvas e Scrollbar
-        self.canvas = tk.Canvas(self.content_frame, bg=COLOR_BACKGROUND_DARK, highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(self.content_frame, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        # self.canvas e self.scrollbar serão empacotados/desempacotados dinamicamente
-
-        self.cards_container = tk.Frame(self.canvas, bg=COLOR_BACKGROUND_DARK)
-        self.canvas.create_window((0, 0), window=self.cards_container, anchor="nw", tags="self.cards_container")
+        self.refresh_indicator = RefreshIndicator(self.content_frame)
 
-        self.cards_container.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        # Vincula eventos de roda do mouse para rolagem
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel) # Windows e macOS
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel)   # Linux (scroll up)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel)   # Linux (scroll down)
-        
-    def _on_mousewheel(self, event):
-        if event.num == 4 or event.delta > 0: # Scroll para cima
-            self.canvas.yview_scroll(-1, "unit")
-        elif event.num == 5 or event.delta < 0: # Scroll para baixo
-            self.canvas.yview_scroll(1, "unit")
+        # Grade de cards com rolagem; as imagens são carregadas conforme os cards ficam visíveis
+        self.card_grid = AdaptiveCardGrid(self.content_frame,
+                                          card_factory=lambda parent, team: TeamCard(parent, team, self.controller, lazy_image=True),
+                                          card_spec=team_card_spec(self.controller))
+        # self.card_grid será empacotado/desempacotado dinamicamente
 
-    # NOVO: Método chamado pelo Controller quando esta tela é exibida
     def on_show(self, **kwargs):
         """Carrega os dados das equipes quando a TeamListView é exibida."""
         self.load_teams() # load_teams() agora inicia uma thread
 
+    def on_hide(self):
+        """Cancela os downloads de imagens pendentes ao sair da tela."""
+        self.card_grid.cancel_images()
+
     # ATUALIZADO: Este método agora inicia o carregamento em uma thread separada
-    def load_teams(self):
-        # 1. Esconde o conteúdo atual (canvas + scrollbar) e mostra o indicador
-        self.canvas.pack_forget()
-        self.scrollbar.pack_forget()
-        self.loading_label.pack(pady=10)
+    def load_teams(self, force=False):
+        repo = self.controller.entity_store.teams
+        cached = repo.peek() if self.controller.stale_while_revalidate else None
+        if cached:
+            # Exibe a última lista conhecida; a API só é consultada se ela estiver vencida
+            self._handle_teams_response(cached)
+            if not force and not repo.is_stale():
+                return
+            self.refresh_indicator.start()
+        else:
+            # 1. Esconde o conteúdo atual (grade de cards) e mostra o indicador
+            self.card_grid.pack_forget()
+            self.loading_label.pack(pady=10)
         
         # 2. Inicia a operação da API em uma nova thread
-        threading.Thread(target=self._fetch_teams_async, daemon=True).start()
+        threading.Thread(target=self._fetch_teams_async, args=(force,), daemon=True).start()
 
-    def _fetch_teams_async(self):
+    def _fetch_teams_async(self, force):
         """Método para buscar as equipes da API em uma thread separada."""
-        response = self.api_client.get_teams()
+        with self.api_client.deadline():
+            response = self.controller.entity_store.teams.get_all(force=force)
         # 3. Usa self.after para agendar a atualização da UI na thread principal do Tkinter
         self.after(0, lambda: self._handle_teams_response(response))
 
@@ -111,54 +111,18 @@ class TeamListView(tk.Frame):
         """Método para processar a resposta da API e atualizar a UI na thread principal."""
         # 4. Esconde o indicador de carregamento
         self.loading_label.pack_forget()
-
-        # 5. Limpa os cards existentes antes de criar novos
-        for widget in self.cards_container.winfo_children():
-            widget.destroy()
+        self.refresh_indicator.stop()
 
         if isinstance(response, dict) and "error" in response:
-            show_error("Erro", response.get("error", "Falha ao carregar equipes."))
+            # Mantém os cards já exibidos, se houver, e só avisa no indicador
+            report_load_error(response.get("error", "Falha ao carregar equipes."), self.refresh_indicator, self.card_grid)
+        elif response == self.teams and self.card_grid.winfo_manager():
+            self.card_grid.schedule_images() # Revalidação sem mudanças: só retoma imagens pendentes
         elif response is not None:
             self.teams = response
-            
-            current_row_frame = None
-            cards_in_current_row = 0
-            max_cols = 4 
-
-            card_width = 340  
-            card_height = 240 
-            padding_x = 15
-            padding_y = 15
-            
-            for team in self.teams:
-                if cards_in_current_row == 0:
-                    current_row_frame = tk.Frame(self.cards_container, bg=COLOR_BACKGROUND_DARK)
-                    current_row_frame.pack(pady=padding_y, anchor="center") 
-
-                card = TeamCard(current_row_frame, team, self.controller)
-                card.grid_propagate(False)
-                card.config(width=card_width, height=card_height)
-
-                card.pack(side=tk.LEFT, padx=padding_x, pady=0) 
-                
-                cards_in_current_row += 1
-                if cards_in_current_row >= max_cols:
-                    cards_in_current_row = 0 
-            
-            # 6. Atualiza o canvas e mostra o scrollbar se necessário
-            self.canvas.update_idletasks() # Força a atualização do layout para obter dimensões corretas
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-            # Empacota o canvas de volta
-            self.canvas.pack(side="left", fill="both", expand=True) 
-
-            # Verifica se a altura do conteúdo excede a altura do canvas para mostrar/esconder a scrollbar
-            if self.canvas.bbox("all") and self.canvas.bbox("all")[3] > self.canvas.winfo_height():
-                self.scrollbar.pack(side="right", fill="y")
-                self.canvas.yview_moveto(0) # Volta para o topo ao recarregar a lista
-            else:
-                self.scrollbar.pack_forget()
-            
+            # 5. Empacota a grade e atualiza os cards (reaproveitados entre recargas)
+            self.card_grid.pack(fill="both", expand=True)
+            self.card_grid.set_items(self.teams)
         else:
             show_error("Erro", "Resposta inesperada da API.")
 
@@ -180,7 +144,7 @@ class AddTeamView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.create_widgets()
 
     def create_widgets(self):
@@ -197,6 +161,7 @@ class AddTeamView(tk.Frame):
         self.logo_url_entry = LabeledEntry(form_frame, "URL do Logo (opcional):")
         self.logo_url_entry.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
         self.logo_url_entry.entry.bind("<FocusOut>", self.update_image_preview)
+        self.logo_url_entry.entry.bind("<KeyRelease>", self.schedule_image_preview)
 
         self.image_preview = ImagePreview(form_frame, label_text="Pré-visualização do Logo:")
         self.image_preview.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=10)
@@ -230,6 +195,10 @@ class AddTeamView(tk.Frame):
         url = self.logo_url_entry.get()
         self.image_preview.load_image_from_url(url)
 
+    def schedule_image_preview(self, event=None):
+        """Atualiza a pré-visualização quando o usuário para de digitar a URL."""
+        self.image_preview.schedule_load(self.logo_url_entry.get())
+
     def save_team(self):
         data = {
             "name": self.name_entry.get(),
@@ -268,7 +237,7 @@ class EditTeamView(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=COLOR_BACKGROUND_DARK)
         self.controller = controller
-        self.api_client = ApiClient()
+        self.api_client = controller.api_client
         self.team_id = None
         self.create_widgets()
 
@@ -286,6 +255,7 @@ class EditTeamView(tk.Frame):
         self.logo_url_entry = LabeledEntry(form_frame, "URL do Logo (opcional):")
         self.logo_url_entry.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
         self.logo_url_entry.entry.bind("<FocusOut>", self.update_image_preview)
+        self.logo_url_entry.entry.bind("<KeyRelease>", self.schedule_image_preview)
 
         self.image_preview = ImagePreview(form_frame, label_text="Pré-visualização do Logo:")
         self.image_preview.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=10)
@@ -336,6 +306,10 @@ class EditTeamView(tk.Frame):
         url = self.logo_url_entry.get()
         self.image_preview.load_image_from_url(url)
 
+    def schedule_image_preview(self, event=None):
+        """Atualiza a pré-visualização quando o usuário para de digitar a URL."""
+        self.image_preview.schedule_load(self.logo_url_entry.get())
+
     def save_changes(self):
         data = {
             "name": self.name_entry.get(),
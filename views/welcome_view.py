@@ -20,6 +20,7 @@ class WelcomeView(tk.Frame):
         self.icons["contract"] = load_icon("contract", size=(24,24))
         self.icons["result"] = load_icon("result", size=(24,24))
         self.icons["standings"] = load_icon("standings", size=(24,24))
+        self.icons["network"] = load_icon("network", size=(24,24))
 
     def create_widgets(self):
         header = AppHeaderFrame(self, title_text="Sistema de Gestão da F1")
@@ -40,7 +41,8 @@ class WelcomeView(tk.Frame):
             ("Corridas", "RaceListView", "race"),
             ("Contratos", "ContractListView", "contract"),
             ("Resultados", "ResultListView", "result"),
-            ("Classificações", "OverallStandingsView", "standings")
+            ("Classificações", "OverallStandingsView", "standings"),
+            ("Inspetor de Rede", "NetworkInspectorView", "network")
         ]
 
         row, col = 0, 0
@@ -0,0 +1,308 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from ui_elements import COLOR_BACKGROUND_DARK, COLOR_FOREGROUND_DARK
+
+# Acima deste número de linhas a VirtualTreeview só materializa as linhas visíveis
+VIRTUAL_TREE_THRESHOLD = 1000
+# Altura de linha usada quando o estilo do Treeview não define rowheight
+DEFAULT_ROW_HEIGHT = 28
+# Linhas roladas por passo da roda do mouse no modo virtual
+WHEEL_ROWS = 3
+# Tempo (s) por quadro gasto inserindo linhas no modo comum; o resto vai para o loop do Tk
+FILL_FRAME_BUDGET = 0.012
+FILL_FRAME_DELAY_MS = 1
+
+def _fmt_count(value):
+    return f"{value:,}".replace(",", " ")
+
+def _sort_key(value):
+    # Números são comparados pelo valor e vêm antes dos textos
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0, str(value).lower())
+
+class VirtualTreeview(tk.Frame):
+    """Tabela cujos dados ficam em Python; com mais de virtual_threshold linhas, só as
+    linhas da área visível viram itens do ttk.Treeview, recriados ao rolar.
+
+    Cada linha é uma sequência de valores e o seu iid é o valor da coluna key_column
+    (o id da entidade), então focus() e item(iid, "values") funcionam como no Treeview,
+    mesmo com a linha selecionada fora da área visível. Clicar em um cabeçalho ordena
+    pela coluna; clicar de novo inverte a ordem.
+
+    No modo comum (até virtual_threshold linhas, ou sempre com virtual_threshold=None)
+    as linhas são inseridas em lotes agendados com after, dentro de FILL_FRAME_BUDGET por
+    quadro, com o progresso exibido no canto da tabela. cancel_fill() interrompe o
+    preenchimento e resume_fill() o continua de onde parou.
+    """
+
+    def __init__(self, parent, columns, key_column=0, virtual_threshold=VIRTUAL_TREE_THRESHOLD,
+                 bg=COLOR_BACKGROUND_DARK, **kwargs):
+        super().__init__(parent, bg=bg)
+        self.columns = tuple(columns)
+        self.key_column = key_column
+        self.virtual_threshold = virtual_threshold
+        self.virtual = False
+        self._rows = [] # [(iid, valores)] na ordem exibida
+        self._values = {} # {iid: valores}
+        self._headings = {} # {coluna: texto sem a seta de ordenação}
+        self._sort = None # (coluna, decrescente)
+        self._offset = 0 # Índice da primeira linha materializada no modo virtual
+        self._selected = "" # iid selecionado no modo virtual (pode estar fora da área visível)
+        self._heading_height = None
+        self._filled = 0 # Linhas já inseridas no modo comum
+        self._fill_job = None
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="browse", **kwargs)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll)
+        self.tree.pack(side="left", fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.progress_label = tk.Label(self, font=("Arial", 9, "italic"), bg=bg, fg=COLOR_FOREGROUND_DARK)
+
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel) # Windows e macOS
+        self.tree.bind("<Button-4>", self._on_mousewheel)   # Linux (scroll up)
+        self.tree.bind("<Button-5>", self._on_mousewheel)   # Linux (scroll down)
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+
+    # API compatível com o ttk.Treeview usada pelas listas
+    def heading(self, column, **kwargs):
+        if "text" in kwargs:
+            self._headings[column] = kwargs["text"]
+        kwargs.setdefault("command", lambda: self.sort_by(column))
+        return self.tree.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        return self.tree.column(column, **kwargs)
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Os eventos (ex.: <Double-1>) são do Treeview interno."""
+        return self.tree.bind(sequence, func, add)
+
+    def focus(self):
+        """iid da linha selecionada, ou "" se não houver seleção."""
+        if self.virtual:
+            return self._selected
+        return self.tree.focus()
+
+    def item(self, iid, option=None, **kwargs):
+        if option == "values" and not kwargs:
+            return self._values.get(iid, ())
+        return self.tree.item(iid, option, **kwargs)
+
+    def get_children(self):
+        return tuple(iid for iid, _ in self._rows)
+
+    # Dados
+    def set_rows(self, rows):
+        """Substitui as linhas da tabela, mantendo a ordenação escolhida pelo usuário.
+
+        Só o que mudou em relação às linhas atuais (pelo iid) é inserido, alterado ou
+        removido no Treeview, então a rolagem e a seleção são preservadas.
+        """
+        old_rows, old_values = self._rows, self._values
+        # O diff exige a tabela anterior inteira no Treeview; senão ela é refeita (em lotes)
+        was_virtual, was_complete = self.virtual, self._filled >= len(old_rows)
+        self._rows = [(str(values[self.key_column]), tuple(values)) for values in rows]
+        self._values = dict(self._rows)
+        self._sort_rows()
+        self.virtual = self.virtual_threshold is not None and len(self._rows) > self.virtual_threshold
+        if self._selected not in self._values:
+            self._selected = ""
+
+        if self.virtual and was_virtual:
+            self._render() # Só a janela visível existe no Treeview; _render ajusta o deslocamento
+        elif not self.virtual and not was_virtual and was_complete and old_rows:
+            self._apply_diff(old_rows, old_values)
+        else:
+            self._offset = 0
+            self._materialize()
+
+    def _apply_diff(self, old_rows, old_values):
+        removed = [iid for iid, _ in old_rows if iid not in self._values]
+        if removed:
+            self.tree.delete(*removed)
+        # Se as linhas que continuam mudaram de ordem, cada uma é movida para o novo índice
+        surviving = [iid for iid, _ in old_rows if iid in self._values]
+        reordered = surviving != [iid for iid, _ in self._rows if iid in old_values]
+        for index, (iid, values) in enumerate(self._rows):
+            old = old_values.get(iid)
+            if old is None:
+                self.tree.insert("", index, iid=iid, values=values)
+                continue
+            if old != values:
+                self.tree.item(iid, values=values)
+            if reordered:
+                self.tree.move(iid, "", index)
+        self._filled = len(self._rows)
+
+    def clear(self):
+        self.set_rows([])
+
+    def sort_by(self, column):
+        current, descending = self._sort or (None, False)
+        self._sort = (column, not descending if column == current else False)
+        self._sort_rows()
+        if self.virtual:
+            self._render()
+        elif self._filled < len(self._rows):
+            self._materialize() # Preenchimento em andamento: recomeça já na nova ordem
+        else:
+            # Reordena os itens existentes em vez de recriá-los
+            for index, (iid, _) in enumerate(self._rows):
+                self.tree.move(iid, "", index)
+
+    def _sort_rows(self):
+        if self._sort is None:
+            return
+        column, descending = self._sort
+        index = self.columns.index(column)
+        # Valores ausentes (None/"") ficam sempre no fim, em qualquer ordem
+        present = [row for row in self._rows if row[1][index] not in (None, "")]
+        missing = [row for row in self._rows if row[1][index] in (None, "")]
+        self._rows = sorted(present, key=lambda row: _sort_key(row[1][index]), reverse=descending) + missing
+
+        for col, text in self._headings.items():
+            arrow = (" ▼" if descending else " ▲") if col == column else ""
+            self.tree.heading(col, text=text + arrow)
+
+    def _materialize(self):
+        self.cancel_fill()
+        self.progress_label.place_forget()
+        self.tree.delete(*self.tree.get_children())
+        self._filled = 0
+        if self.virtual:
+            self._render()
+        else:
+            self._fill_step()
+
+    # Preenchimento em lotes (modo comum)
+    def _fill_step(self):
+        self._fill_job = None
+        deadline = time.perf_counter() + FILL_FRAME_BUDGET
+        total = len(self._rows)
+        while self._filled < total:
+            iid, values = self._rows[self._filled]
+            self.tree.insert("", tk.END, iid=iid, values=values)
+            self._filled += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        if self._filled < total:
+            self.progress_label.config(text=f"{_fmt_count(self._filled)} / {_fmt_count(total)}")
+            self.progress_label.place(relx=1.0, rely=1.0, anchor="se")
+            self.progress_label.lift()
+            self._fill_job = self.after(FILL_FRAME_DELAY_MS, self._fill_step)
+        else:
+            self.progress_label.place_forget()
+
+    def cancel_fill(self):
+        """Interrompe o preenchimento em lotes; devolve True se havia um em andamento."""
+        if self._fill_job is None:
+            return False
+        self.after_cancel(self._fill_job)
+        self._fill_job = None
+        return True
+
+    def resume_fill(self):
+        """Continua um preenchimento interrompido por cancel_fill()."""
+        if not self.virtual and self._fill_job is None and self._filled < len(self._rows):
+            self._fill_step()
+
+    # Modo virtual
+    def _row_height(self):
+        style = self.tree.cget("style") or "Treeview"
+        try:
+            return int(ttk.Style().lookup(style, "rowheight") or DEFAULT_ROW_HEIGHT)
+        except (ValueError, tk.TclError):
+            return DEFAULT_ROW_HEIGHT
+
+    def _page_size(self):
+        """Quantas linhas cabem inteiras na área visível do Treeview."""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget("height")) # Ainda sem tamanho: usa a altura configurada
+        row_height = self._row_height()
+        return max(1, (height - (self._heading_height or row_height)) // row_height)
+
+    def _render(self):
+        if not self.virtual:
+            return
+        count = self._page_size()
+        total = len(self._rows)
+        self._offset = max(0, min(self._offset, total - count))
+
+        self.tree.delete(*self.tree.get_children())
+        for iid, values in self._rows[self._offset:self._offset + count]:
+            self.tree.insert("", tk.END, iid=iid, values=values)
+        self.tree.yview_moveto(0)
+
+        children = self.tree.get_children()
+        if children and self._heading_height is None:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                self._heading_height = bbox[1] # A primeira linha começa logo abaixo do cabeçalho
+        if self._selected and self.tree.exists(self._selected):
+            self.tree.selection_set(self._selected)
+            self.tree.focus(self._selected)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + count) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, len(self._rows) - self._page_size()))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        # Linhas removidas ao rolar também disparam o evento, com a seleção vazia
+        if self.virtual and selection:
+            self._selected = selection[0]
+
+    def _on_scrollbar(self, *args):
+        if not self.virtual:
+            self.tree.yview(*args)
+        elif args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._rows)))
+        elif args[0] == "scroll":
+            step = self._page_size() if args[2] == "pages" else 1
+            self._scroll_to(self._offset + int(args[1]) * step)
+
+    def _on_tree_yscroll(self, first, last):
+        if not self.virtual:
+            self.scrollbar.set(first, last)
+        elif float(first) > 0:
+            # O Treeview rolou sozinho (ex.: see() ao navegar pelo teclado): desloca a janela
+            shown = len(self.tree.get_children())
+            self._scroll_to(self._offset + round(float(first) * shown))
+
+    def _on_mousewheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4 or event.delta > 0: # Scroll para cima
+            self._scroll_to(self._offset - WHEEL_ROWS)
+        elif event.num == 5 or event.delta < 0: # Scroll para baixo
+            self._scroll_to(self._offset + WHEEL_ROWS)
+        return "break"
+
+    def _on_arrow(self, step):
+        children = self.tree.get_children()
+        if not self.virtual or not children:
+            return None
+        edge = children[0] if step < 0 else children[-1]
+        if self.tree.focus() != edge:
+            return None # Navegação normal dentro da área visível
+        index = self._offset + children.index(edge) + step
+        if 0 <= index < len(self._rows):
+            self._selected = self._rows[index][0]
+            self._scroll_to(self._offset + step)
+        return "break"